@@ -5,10 +5,31 @@ import json
 import time
 import requests
 import pandas as pd
-from typing import Dict, List, Any, Optional, Callable
+from requests.adapters import HTTPAdapter
+from itertools import chain
+from typing import Dict, List, Any, Optional, Callable, Iterator, Union
 from io import BytesIO
 from urllib.parse import quote_plus
 
+# orjson is optional; fall back to the standard library json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Keep-alive pool for api.apify.com across the start, polling and fetch requests
+HTTP_POOL_CONNECTIONS = 8
+HTTP_POOL_MAXSIZE = 32
+
+def _ndjson_line(record: Dict) -> str:
+    """Encode one record as a newline-terminated UTF-8 JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE).decode()
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
 class ApifyJobScraper:
     """Simplified and reliable job scraper using proven Apify actors"""
     
@@ -39,6 +60,12 @@ class ApifyJobScraper:
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         })
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
     
     def get_available_platforms(self) -> List[str]:
         return self.available_platforms
@@ -91,8 +118,16 @@ class ApifyJobScraper:
                    max_items: int = 50,
                    exact_match: bool = True,
                    progress_callback: Optional[Callable] = None,
-                   status_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
-        """Main scraping method"""
+                   status_callback: Optional[Callable] = None,
+                   sink_path: Optional[str] = None,
+                   collect: bool = True) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Main scraping method
+        
+        With sink_path, dataset items are processed as they stream in and each
+        relevant job is appended to that NDJSON file. Pass collect=False as well
+        to keep memory flat and get back {"count", "path"} instead of the list.
+        """
         
         platform = platform.lower()
         if platform not in self.available_platforms:
@@ -197,21 +232,24 @@ class ApifyJobScraper:
             if status_callback:
                 status_callback("📥 Fetching results...")
             
-            # Get results with multiple fallback methods
-            raw_results = []
+            # Get results with multiple fallback methods; dataset items are read lazily
+            raw_items = iter(())
+            first_item = None
             
             # Method 1: Standard dataset fetch
             try:
                 results_response = self.session.get(
                     f"{self.base_url}/acts/{actor_id}/runs/{run_id}/dataset/items",
-                    params={"token": self.api_key, "format": "json"},
-                    timeout=30
+                    params={"token": self.api_key, "format": "jsonl"},
+                    timeout=30,
+                    stream=True
                 )
                 
                 if results_response.status_code == 200:
-                    raw_results = results_response.json()
+                    raw_items = self._iter_jsonl_items(results_response)
+                    first_item = next(raw_items, None)
                     if self.debug:
-                        print(f"✅ Method 1 successful: {len(raw_results)} results")
+                        print(f"✅ Method 1 successful: {'streaming results' if first_item else 'no results'}")
                 elif self.debug:
                     print(f"⚠️ Method 1 failed: HTTP {results_response.status_code}")
             except Exception as e:
@@ -219,7 +257,7 @@ class ApifyJobScraper:
                     print(f"⚠️ Method 1 error: {e}")
             
             # Method 2: Get dataset ID from run info and try that
-            if not raw_results:
+            if first_item is None:
                 try:
                     run_info_response = self.session.get(
                         f"{self.base_url}/acts/{actor_id}/runs/{run_id}",
@@ -234,14 +272,16 @@ class ApifyJobScraper:
                         if dataset_id:
                             dataset_response = self.session.get(
                                 f"{self.base_url}/datasets/{dataset_id}/items",
-                                params={"token": self.api_key, "format": "json"},
-                                timeout=30
+                                params={"token": self.api_key, "format": "jsonl"},
+                                timeout=30,
+                                stream=True
                             )
                             
                             if dataset_response.status_code == 200:
-                                raw_results = dataset_response.json()
-                                if self.debug:
-                                    print(f"✅ Method 2 successful with dataset {dataset_id}: {len(raw_results)} results")
+                                raw_items = self._iter_jsonl_items(dataset_response)
+                                first_item = next(raw_items, None)
+                                if self.debug and first_item is not None:
+                                    print(f"✅ Method 2 successful with dataset {dataset_id}")
                             elif self.debug:
                                 print(f"⚠️ Method 2 dataset failed: HTTP {dataset_response.status_code}")
                     elif self.debug:
@@ -251,7 +291,7 @@ class ApifyJobScraper:
                         print(f"⚠️ Method 2 error: {e}")
             
             # Method 3: Try key-value store
-            if not raw_results:
+            if first_item is None:
                 try:
                     kv_response = self.session.get(
                         f"{self.base_url}/key-value-stores/default/records/OUTPUT",
@@ -261,55 +301,74 @@ class ApifyJobScraper:
                     
                     if kv_response.status_code == 200:
                         kv_data = kv_response.json()
+                        kv_items = []
                         if isinstance(kv_data, list):
-                            raw_results = kv_data
+                            kv_items = kv_data
                         elif isinstance(kv_data, dict) and "items" in kv_data:
-                            raw_results = kv_data["items"]
+                            kv_items = kv_data["items"]
                         
-                        if raw_results and self.debug:
-                            print(f"✅ Method 3 successful: {len(raw_results)} results")
+                        raw_items = iter(kv_items)
+                        first_item = next(raw_items, None)
+                        if kv_items and self.debug:
+                            print(f"✅ Method 3 successful: {len(kv_items)} results")
                     elif self.debug:
                         print(f"⚠️ Method 3 failed: HTTP {kv_response.status_code}")
                 except Exception as e:
                     if self.debug:
                         print(f"⚠️ Method 3 error: {e}")
             
-            if not raw_results:
+            if first_item is None:
                 raise Exception("Failed to fetch results using all available methods")
             
-            if not raw_results:
-                if status_callback:
-                    status_callback("⚠️ No jobs found")
-                return []
-            
             if self.debug:
-                print(f"📊 Raw results: {len(raw_results)}")
-                if raw_results:
-                    sample = raw_results[0]
-                    print(f"📋 Sample fields: {list(sample.keys())[:10]}")
-                    # Check for error responses
-                    if "error" in sample:
-                        print(f"⚠️ Error in results: {sample.get('error', 'Unknown error')}")
-                    elif sample:
-                        print(f"📄 Sample data: {sample}")
+                sample = first_item
+                print(f"📋 Sample fields: {list(sample.keys())[:10]}")
+                # Check for error responses
+                if "error" in sample:
+                    print(f"⚠️ Error in results: {sample.get('error', 'Unknown error')}")
+                elif sample:
+                    print(f"📄 Sample data: {sample}")
             
             # Filter out error results
-            raw_results = [result for result in raw_results if not result.get("error")]
-            
-            # Process results
-            processed_jobs = self.process_results(raw_results, platform)
-            
-            # Filter for relevance
-            relevant_jobs = self.filter_relevant_jobs(processed_jobs, query)
+            raw_items = (item for item in chain([first_item], raw_items) if not item.get("error"))
+            
+            if sink_path:
+                # Process and write each item as it arrives instead of holding the dataset
+                relevant_jobs = []
+                written = 0
+                with open(sink_path, "w", encoding="utf-8") as sink:
+                    for raw_item in raw_items:
+                        for job in self.filter_relevant_jobs(self.process_results([raw_item], platform), query):
+                            sink.write(_ndjson_line(job))
+                            written += 1
+                            if collect:
+                                relevant_jobs.append(job)
+                
+                relevant_jobs.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+                
+                if self.debug:
+                    print(f"📈 Wrote {written} relevant jobs to {sink_path}")
+            else:
+                raw_results = list(raw_items)
+                
+                # Process results
+                processed_jobs = self.process_results(raw_results, platform)
+                
+                # Filter for relevance
+                relevant_jobs = self.filter_relevant_jobs(processed_jobs, query)
+                written = len(relevant_jobs)
+                
+                if self.debug:
+                    print(f"📈 Processing: {len(raw_results)} → {len(processed_jobs)} → {len(relevant_jobs)}")
             
             if progress_callback:
                 progress_callback(1.0)
             
             if status_callback:
-                status_callback(f"✅ Found {len(relevant_jobs)} relevant jobs!")
+                status_callback(f"✅ Found {written} relevant jobs!")
             
-            if self.debug:
-                print(f"📈 Processing: {len(raw_results)} → {len(processed_jobs)} → {len(relevant_jobs)}")
+            if not collect:
+                return {"count": written, "path": sink_path}
             
             return relevant_jobs
             
@@ -319,6 +378,13 @@ class ApifyJobScraper:
                 status_callback(f"❌ {error_msg}")
             raise Exception(error_msg)
     
+    def _iter_jsonl_items(self, response: requests.Response) -> Iterator[Dict]:
+        """Yield dataset items from a streamed format=jsonl response, one line at a time"""
+        with response:
+            for line in response.iter_lines():
+                if line:
+                    yield _json_loads(line)
+    
     def process_results(self, raw_results: List[Dict], platform: str) -> List[Dict[str, Any]]:
         """Process raw results into standardized format"""
         processed_jobs = []
@@ -347,8 +413,12 @@ class ApifyJobScraper:
                 "salary_info": ["salary"]
             }
         
-        for job_data in raw_results:
-            try:
+        try:
+            for job_data in raw_results:
+                # Skip malformed records up front instead of catching errors per job
+                if not isinstance(job_data, dict):
+                    continue
+                
                 processed_job = {"platform": platform}
                 
                 # Extract fields
@@ -371,52 +441,51 @@ class ApifyJobScraper:
                                 processed_job["salary_info"] = f"Up to ${max_sal}"
                 
                 # Clean description
-                if processed_job["job_description"] and len(processed_job["job_description"]) > 500:
-                    processed_job["job_description"] = processed_job["job_description"][:500] + "..."
+                description = processed_job["job_description"]
+                if len(description) > 500:
+                    processed_job["job_description"] = description[:500] + "..."
                 
                 # Only keep jobs with basic info
-                if processed_job.get("job_title") or processed_job.get("company_name"):
+                if processed_job["job_title"] or processed_job["company_name"]:
                     processed_jobs.append(processed_job)
-                    
-            except Exception as e:
-                if self.debug:
-                    print(f"⚠️ Error processing job: {e}")
-                continue
+        
+        except Exception as e:
+            # Only truly unexpected failures land here, reported once for the batch
+            if self.debug:
+                print(f"⚠️ Error processing jobs: {e}")
         
         return processed_jobs
     
     def extract_field(self, data: Dict, possible_keys: List[str]) -> str:
         """Extract field value from job data"""
         for key in possible_keys:
-            try:
-                if '.' in key:
-                    # Handle nested keys like "salarySnippet.text"
-                    parts = key.split('.')
-                    value = data
-                    for part in parts:
-                        if isinstance(value, dict) and part in value:
-                            value = value[part]
-                        else:
-                            value = None
-                            break
-                    
-                    if value is not None:
-                        return str(value).strip()
-                else:
-                    # Direct key access
-                    if key in data and data[key] is not None:
-                        value = data[key]
-                        if isinstance(value, (str, int, float)):
-                            return str(value).strip()
-                        elif isinstance(value, list) and value:
-                            # Handle job types as comma-separated string
-                            if key == "jobType":
-                                return ", ".join(str(v) for v in value)
-                            return str(value[0]).strip()
-                        elif isinstance(value, dict) and "text" in value:
-                            return str(value["text"]).strip()
-            except:
-                continue
+            if '.' in key:
+                # Handle nested keys like "salarySnippet.text"
+                parts = key.split('.')
+                value = data
+                for part in parts:
+                    if isinstance(value, dict) and part in value:
+                        value = value[part]
+                    else:
+                        value = None
+                        break
+                
+                if value is not None:
+                    return str(value).strip()
+            else:
+                # Direct key access
+                value = data.get(key)
+                if value is None:
+                    continue
+                if isinstance(value, (str, int, float)):
+                    return str(value).strip()
+                elif isinstance(value, list) and value:
+                    # Handle job types as comma-separated string
+                    if key == "jobType":
+                        return ", ".join(str(v) for v in value)
+                    return str(value[0]).strip()
+                elif isinstance(value, dict) and "text" in value:
+                    return str(value["text"]).strip()
         
         return ""
     
@@ -480,7 +549,7 @@ class ApifyJobScraper:
             return None
         
         try:
-            df = pd.DataFrame(jobs_data)
+            from openpyxl import Workbook
             
             # Clean column mapping
             columns = {
@@ -495,29 +564,28 @@ class ApifyJobScraper:
                 'Relevance Score': 'relevance_score'
             }
             
-            excel_data = {}
-            for excel_col, data_col in columns.items():
-                if data_col in df.columns:
-                    excel_data[excel_col] = df[data_col]
-                else:
-                    excel_data[excel_col] = [''] * len(df)
+            # Stream rows straight into a write-only workbook (no intermediate DataFrame)
+            workbook = Workbook(write_only=True)
             
-            excel_df = pd.DataFrame(excel_data)
+            jobs_sheet = workbook.create_sheet('Jobs')
+            jobs_sheet.append(list(columns.keys()))
+            for job in jobs_data:
+                jobs_sheet.append([job.get(data_col) for data_col in columns.values()])
             
             # Create metadata
-            metadata = pd.DataFrame({
-                'Search Query': [search_query],
-                'Location': [search_location],
-                'Platform': [platform.title()],
-                'Total Jobs': [len(df)],
-                'Export Date': [pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')]
-            })
+            info_sheet = workbook.create_sheet('Info')
+            info_sheet.append(['Search Query', 'Location', 'Platform', 'Total Jobs', 'Export Date'])
+            info_sheet.append([
+                search_query,
+                search_location,
+                platform.title(),
+                len(jobs_data),
+                pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+            ])
             
             # Write to Excel
             output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                excel_df.to_excel(writer, sheet_name='Jobs', index=False)
-                metadata.to_excel(writer, sheet_name='Info', index=False)
+            workbook.save(output)
             
             return output.getvalue()
             
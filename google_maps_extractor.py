@@ -4,12 +4,25 @@ import os
 import json
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Any, Optional, Callable
 from apify_client import ApifyClient
 from dotenv import load_dotenv
+from src.utils.rate_limiter import RateLimiter
 
 load_dotenv()
 
+# Apify actor runs are independent, so several companies are extracted at once
+MAX_CONCURRENT_EXTRACTIONS = int(os.getenv("MAX_CONCURRENT_EXTRACTIONS", "3"))
+
+# Minimum spacing between actor run starts to avoid rate limiting
+RUN_START_INTERVAL_SECONDS = 2.0
+
+# Keep-alive pool for api.apify.com, sized so every extraction thread gets a connection
+HTTP_POOL_CONNECTIONS = 2
+HTTP_POOL_MAXSIZE = max(MAX_CONCURRENT_EXTRACTIONS, 4)
+
 class GoogleMapsExtractor:
     """Enhanced Google Maps business extractor using Apify Google Maps scraper"""
     
@@ -21,6 +34,12 @@ class GoogleMapsExtractor:
         # Set base URL first
         self.base_url = "https://api.apify.com/v2"
         
+        # Reuse one TCP/TLS connection across dataset reads instead of reconnecting per company
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {self.apify_token}"})
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        
         # Validate API key format (make it more flexible)
         if not self.apify_token.startswith("apify_api_") and len(self.apify_token) < 10:
             raise ValueError(f"Invalid Apify API key format. Please check your API key from https://console.apify.com/account/integrations")
@@ -45,13 +64,16 @@ class GoogleMapsExtractor:
         except Exception as e:
             raise ValueError(f"Failed to initialize Apify client: {str(e)}")
     
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
     def _test_authentication(self):
         """Test if the API key is valid"""
         try:
             auth_url = f"{self.base_url}/users/me"
-            headers = {"Authorization": f"Bearer {self.apify_token}"}
             
-            response = requests.get(auth_url, headers=headers, timeout=10)
+            response = self.session.get(auth_url, timeout=10)
             
             if response.status_code == 401:
                 raise ValueError(
@@ -132,42 +154,67 @@ class GoogleMapsExtractor:
         
         all_results = []
         total_companies = len(business_names)
+        if not total_companies:
+            return all_results
         
-        for i, business_name in enumerate(business_names):
-            try:
-                if status_callback:
-                    status_callback(f"Processing {business_name} ({i+1}/{total_companies})")
+        # Runs overlap on Apify's side; only their start times are spaced out
+        start_limiter = RateLimiter(RUN_START_INTERVAL_SECONDS)
+        
+        def run_extraction(business_name: str) -> List[Dict[str, Any]]:
+            start_limiter.wait()
+            return self.extract_single_business(business_name, location)
+        
+        if status_callback:
+            status_callback(f"Processing {total_companies} companies ({MAX_CONCURRENT_EXTRACTIONS} at a time)")
+        
+        # Results are kept per input slot so the output order matches business_names
+        results_by_index = [None] * total_companies
+        completed = 0
+        
+        # Callbacks stay on this thread; worker threads only wait on Apify
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EXTRACTIONS) as executor:
+            future_to_index = {
+                executor.submit(run_extraction, business_name): i
+                for i, business_name in enumerate(business_names)
+            }
+            
+            for future in as_completed(future_to_index):
+                i = future_to_index[future]
+                business_name = business_names[i]
+                completed += 1
                 
                 if progress_callback:
-                    progress_callback(i / total_companies)
+                    progress_callback(completed / total_companies)
                 
-                # Extract data for single business
-                business_data = self.extract_single_business(business_name, location)
+                try:
+                    business_data = future.result()
+                except Exception as e:
+                    error_msg = str(e)
+                    if "401" in error_msg:
+                        if status_callback:
+                            status_callback(f"❌ Authentication error - Please check your Apify API key")
+                        print(f"Authentication error for {business_name}: {error_msg}")
+                        # Don't start any more runs if authentication fails
+                        for pending in future_to_index:
+                            pending.cancel()
+                        break
+                    else:
+                        if status_callback:
+                            status_callback(f"❌ Error processing {business_name}: {error_msg}")
+                        print(f"Error extracting data for {business_name}: {error_msg}")
+                    continue
                 
                 if business_data:
-                    all_results.extend(business_data)
+                    results_by_index[i] = business_data
                     if status_callback:
                         status_callback(f"✅ Found {len(business_data)} locations for {business_name}")
                 else:
                     if status_callback:
                         status_callback(f"⚠️ No data found for {business_name}")
-                
-                # Small delay to avoid rate limiting
-                time.sleep(2)
-                
-            except Exception as e:
-                error_msg = str(e)
-                if "401" in error_msg:
-                    if status_callback:
-                        status_callback(f"❌ Authentication error - Please check your Apify API key")
-                    print(f"Authentication error for {business_name}: {error_msg}")
-                    # Don't continue if authentication fails
-                    break
-                else:
-                    if status_callback:
-                        status_callback(f"❌ Error processing {business_name}: {error_msg}")
-                    print(f"Error extracting data for {business_name}: {error_msg}")
-                continue
+        
+        for business_data in results_by_index:
+            if business_data:
+                all_results.extend(business_data)
         
         if progress_callback:
             progress_callback(1.0)
@@ -253,9 +300,8 @@ class GoogleMapsExtractor:
         """Get dataset items using direct API call (more reliable)"""
         try:
             url = f"{self.base_url}/datasets/{dataset_id}/items"
-            headers = {"Authorization": f"Bearer {self.apify_token}"}
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
             raw_items = response.json()
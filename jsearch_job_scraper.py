@@ -3,15 +3,214 @@
 import requests
 import json
 import os
-from typing import Dict, List, Any, Optional
+import asyncio
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
+from search_cache import SearchCache
+
+# orjson is optional; fall back to the standard library json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
 load_dotenv()
 
+# JSearch returns this many jobs per result page
+JSEARCH_PAGE_SIZE = 10
+
+# JSearch serves at most this many pages per /search request
+JSEARCH_MAX_PAGES = 20
+
+# Keep-alive pool for jsearch.p.rapidapi.com, shared by every request on the instance
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+
+# Upper bound on concurrent JSearch requests in multi-location searches
+MAX_CONCURRENT_SEARCHES = 8
+
+# Locations with fewer batched hits than this are searched individually
+BATCH_MIN_LOCATION_HITS = 5
+
+# Rows per Parquet row group when exporting results
+PARQUET_ROW_GROUP_SIZE = 50000
+
+# Job lists at or above this size are aggregated across worker processes
+PARALLEL_EXTRACTION_THRESHOLD = 5000
+
+# Completed searches shared by all scraper instances in this process
+_search_cache = SearchCache("jsearch")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_company_name(name: str) -> Tuple[str, str]:
+    """
+    Return (stripped name, lowercased key) for an employer name
+    
+    Companies with many postings repeat the same name, so the normalized
+    forms are interned here instead of being recomputed for every job.
+    """
+    stripped = name.strip()
+    return stripped, stripped.lower()
+
+
+def _aggregate_company_shard(jobs_data: List[Dict]) -> Dict[str, Dict]:
+    """
+    Build per-company aggregates for a list of jobs
+    
+    Kept at module level so it can be pickled and run in a worker process.
+    Returns a mapping of lowercased company name to raw company data.
+    """
+    companies = {}
+    
+    for job in jobs_data:
+        # Use lowercased company name as key for deduplication
+        company_name, company_key = _normalize_company_name(job.get('employer_name', ''))
+        
+        if not company_name or company_key in ['unknown', 'not specified', 'n/a']:
+            continue
+        
+        if company_key not in companies:
+            # Extract company information
+            companies[company_key] = {
+                'company_name': company_name,
+                'company_website': job.get('employer_website', ''),
+                'company_logo': job.get('employer_logo', ''),
+                'company_type': job.get('employer_company_type', ''),
+                'company_reviews': job.get('employer_reviews', ''),
+                'company_rating': job.get('employer_rating', ''),
+                'glassdoor_rating': job.get('employer_glassdoor_rating', ''),
+                'company_size': job.get('employer_employees', '') or job.get('employer_size', ''),
+                'headquarters': job.get('employer_headquarters', ''),
+                'industry': job.get('employer_industry', ''),
+                'founded_year': job.get('employer_founded', ''),
+                'description': job.get('employer_description', ''),
+                'job_count': 0,
+                'job_titles': [],
+                'job_locations': set(),
+                'salary_ranges': [],
+                'job_links': [],
+                'first_seen_date': job.get('job_posted_at_datetime_utc', ''),
+                'last_seen_date': job.get('job_posted_at_datetime_utc', ''),
+                'employment_types': set(),
+                'experience_levels': set()
+            }
+        
+        company = companies[company_key]
+        
+        # Update company statistics
+        company['job_count'] += 1
+        
+        # Collect job information
+        if job.get('job_title'):
+            company['job_titles'].append(job['job_title'])
+        
+        # Location information
+        location_parts = []
+        if job.get('job_city'): location_parts.append(job['job_city'])
+        if job.get('job_state'): location_parts.append(job['job_state'])
+        if job.get('job_country'): location_parts.append(job['job_country'])
+        if location_parts:
+            company['job_locations'].add(', '.join(location_parts))
+        
+        # Salary information
+        salary_min = job.get('job_salary_min')
+        salary_max = job.get('job_salary_max')
+        salary_currency = job.get('job_salary_currency', 'USD')
+        
+        if salary_min or salary_max:
+            salary_range = f"{salary_min or 'N/A'} - {salary_max or 'N/A'} {salary_currency}"
+            company['salary_ranges'].append(salary_range)
+        
+        # Job links
+        if job.get('job_apply_link'):
+            company['job_links'].append(job['job_apply_link'])
+        
+        # Employment types and experience
+        if job.get('job_employment_type'):
+            company['employment_types'].add(job['job_employment_type'])
+        
+        if job.get('job_required_experience'):
+            company['experience_levels'].add(job['job_required_experience'])
+        
+        # Update last seen date
+        job_date = job.get('job_posted_at_datetime_utc', '')
+        if job_date and job_date > company['last_seen_date']:
+            company['last_seen_date'] = job_date
+    
+    return companies
+
+
+def _job_dedupe_key(job: Dict) -> Tuple[str, str, str, str]:
+    """Normalized (title, employer, city, state) identity of a job posting"""
+    return (
+        (job.get('job_title') or '').strip().lower(),
+        _normalize_company_name(job.get('employer_name') or '')[1],
+        (job.get('job_city') or '').strip().lower(),
+        (job.get('job_state') or '').strip().lower()
+    )
+
+
+def _scan_numbers(text: str) -> List[int]:
+    """Collect every run of digits in text as an int (single pass, no regex)"""
+    numbers = []
+    current = None
+    
+    for char in text:
+        if char.isdecimal():
+            current = (current or 0) * 10 + int(char)
+        elif current is not None:
+            numbers.append(current)
+            current = None
+    
+    if current is not None:
+        numbers.append(current)
+    
+    return numbers
+
+
+@lru_cache(maxsize=4096)
+def _parse_employee_text(text: str) -> Optional[int]:
+    """
+    Parse employee count from text like '100-500', '1000+', 'small company'
+    
+    Cached because the same size strings ("11-50 employees", "1000+") repeat
+    across many jobs from the same employers.
+    """
+    text = text.lower()
+    
+    # Handle specific patterns
+    if "startup" in text or "small" in text:
+        return 50  # Assume small company
+    elif "enterprise" in text or "large" in text:
+        return 5000  # Assume large company
+    elif "medium" in text or "mid-size" in text:
+        return 500  # Assume medium company
+    
+    # Extract numbers from ranges like "100-500" or "1000+"
+    nums = _scan_numbers(text)
+    if len(nums) >= 2:
+        # Take average of range
+        return sum(nums) // len(nums)
+    elif len(nums) == 1:
+        return nums[0]
+    
+    return None
+
+
 class JSearchJobScraper:
     """Job scraper using JSearch RapidAPI - Much more reliable than LinkedIn scraping"""
     
-    def __init__(self, rapidapi_key: str = None):
+    def __init__(self, rapidapi_key: str = None, use_cache: bool = True):
+        self.use_cache = use_cache
         self.rapidapi_key = rapidapi_key or os.getenv("RAPIDAPI_KEY")
         if not self.rapidapi_key:
             raise ValueError("RapidAPI key is required. Set RAPIDAPI_KEY environment variable.")
@@ -21,6 +220,16 @@ class JSearchJobScraper:
             "x-rapidapi-key": self.rapidapi_key,
             "x-rapidapi-host": "jsearch.p.rapidapi.com"
         }
+        
+        # Reuse one TCP/TLS connection across result pages instead of reconnecting per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
     
     def search_jobs(self, 
                    query: str = "software engineer",
@@ -53,6 +262,68 @@ class JSearchJobScraper:
             employer_website: Filter for employers with websites
         """
         
+        querystring = self._build_search_params(
+            query=query,
+            location=location,
+            page=page,
+            num_pages=num_pages,
+            country=country,
+            date_posted=date_posted,
+            employment_types=employment_types,
+            job_requirements=job_requirements,
+            remote_jobs_only=remote_jobs_only,
+            platform=platform,
+            company_types=company_types,
+            employer_website=employer_website
+        )
+        search_query = querystring["query"]
+        
+        cache_key = _search_cache.make_key(querystring) if self.use_cache else None
+        if cache_key is not None:
+            cached = _search_cache.get(cache_key)
+            if cached is not None:
+                print(f"✅ Found {len(cached.get('data', []))} jobs (cached): {search_query}")
+                return cached
+        
+        try:
+            print(f"🔍 Searching jobs: {search_query}")
+            print(f"📋 Parameters: {querystring}")
+            
+            response = self.session.get(
+                f"{self.base_url}/search",
+                params=querystring,
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                data = _json_loads(response.content)
+                jobs_found = len(data.get('data', []))
+                print(f"✅ Found {jobs_found} jobs successfully")
+                if cache_key is not None:
+                    _search_cache.set(cache_key, data)
+                return data
+            else:
+                print(f"❌ API Error: {response.status_code} - {response.text}")
+                return {"error": f"API returned status code {response.status_code}"}
+                
+        except Exception as e:
+            print(f"❌ Request failed: {str(e)}")
+            return {"error": str(e)}
+    
+    def _build_search_params(self,
+                             query: str = "software engineer",
+                             location: str = "United States",
+                             page: int = 1,
+                             num_pages: int = 1,
+                             country: str = "us",
+                             date_posted: str = "all",
+                             employment_types: str = "FULLTIME,PARTTIME",
+                             job_requirements: str = "under_3_years_experience,more_than_3_years_experience",
+                             remote_jobs_only: bool = False,
+                             platform: str = None,
+                             company_types: str = None,
+                             employer_website: bool = None) -> Dict[str, str]:
+        """Build the JSearch /search query string (see search_jobs for argument details)"""
         # Build query string with platform specification
         if location.lower() != "remote" and not remote_jobs_only:
             if platform:
@@ -68,7 +339,7 @@ class JSearchJobScraper:
         querystring = {
             "query": search_query,
             "page": str(page),
-            "num_pages": str(min(num_pages, 20)),  # API limit
+            "num_pages": str(min(num_pages, JSEARCH_MAX_PAGES)),  # API limit
             "country": country,
             "date_posted": date_posted
         }
@@ -85,26 +356,39 @@ class JSearchJobScraper:
         if employer_website is not None:
             querystring["employer_website"] = "true" if employer_website else "false"
         
+        return querystring
+    
+    async def _search_jobs_async(self, session: aiohttp.ClientSession, **search_kwargs) -> Dict[str, Any]:
+        """Async counterpart of search_jobs sharing an aiohttp session"""
+        querystring = self._build_search_params(**search_kwargs)
+        
+        cache_key = _search_cache.make_key(querystring) if self.use_cache else None
+        if cache_key is not None:
+            cached = await _search_cache.aget(cache_key)
+            if cached is not None:
+                print(f"✅ Found {len(cached.get('data', []))} jobs (cached): {querystring['query']}")
+                return cached
+        
         try:
-            print(f"🔍 Searching jobs: {search_query}")
-            print(f"📋 Parameters: {querystring}")
+            print(f"🔍 Searching jobs: {querystring['query']}")
             
-            response = requests.get(
+            async with session.get(
                 f"{self.base_url}/search",
                 headers=self.headers,
                 params=querystring,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                jobs_found = len(data.get('data', []))
-                print(f"✅ Found {jobs_found} jobs successfully")
-                return data
-            else:
-                print(f"❌ API Error: {response.status_code} - {response.text}")
-                return {"error": f"API returned status code {response.status_code}"}
-                
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None, loads=_json_loads)
+                    jobs_found = len(data.get('data', []))
+                    print(f"✅ Found {jobs_found} jobs successfully")
+                    if cache_key is not None:
+                        await _search_cache.aset(cache_key, data)
+                    return data
+                else:
+                    print(f"❌ API Error: {response.status} - {await response.text()}")
+                    return {"error": f"API returned status code {response.status}"}
+                    
         except Exception as e:
             print(f"❌ Request failed: {str(e)}")
             return {"error": str(e)}
@@ -114,44 +398,170 @@ class JSearchJobScraper:
         querystring = {"job_id": job_id}
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/job-details",
-                headers=self.headers,
                 params=querystring,
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return _json_loads(response.content)
             else:
                 return {"error": f"API returned status code {response.status_code}"}
                 
         except Exception as e:
             return {"error": str(e)}
     
+    def _collect_jobs(self, max_results: int, **search_kwargs) -> List[Dict]:
+        """
+        Fetch result pages one at a time until max_results jobs are collected
+        
+        Stops early when a page comes back short or with an error so no quota
+        is spent on pages that are not needed.
+        """
+        collected = []
+        page = 1
+        
+        while len(collected) < max_results:
+            results = self.search_jobs(page=page, num_pages=1, **search_kwargs)
+            page_jobs = results.get("data")
+            if not page_jobs:
+                break
+            
+            collected.extend(page_jobs)
+            if len(page_jobs) < JSEARCH_PAGE_SIZE:
+                break
+            page += 1
+        
+        return collected[:max_results]
+    
+    async def _collect_jobs_async(self, session: aiohttp.ClientSession, max_results: int, **search_kwargs) -> List[Dict]:
+        """Async counterpart of _collect_jobs"""
+        collected = []
+        page = 1
+        
+        while len(collected) < max_results:
+            results = await self._search_jobs_async(session, page=page, num_pages=1, **search_kwargs)
+            page_jobs = results.get("data")
+            if not page_jobs:
+                break
+            
+            collected.extend(page_jobs)
+            if len(page_jobs) < JSEARCH_PAGE_SIZE:
+                break
+            page += 1
+        
+        return collected[:max_results]
+    
     def search_multiple_locations(self, 
                                  query: str,
                                  locations: List[str],
                                  max_results_per_location: int = 10) -> List[Dict]:
         """Search jobs across multiple locations"""
-        all_jobs = []
+        return asyncio.run(self.search_multiple_locations_async(query, locations, max_results_per_location))
+    
+    async def search_multiple_locations_async(self,
+                                              query: str,
+                                              locations: List[str],
+                                              max_results_per_location: int = 10) -> List[Dict]:
+        """Search jobs across multiple locations concurrently"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
         
-        for location in locations:
-            print(f"\n🌍 Searching in {location}...")
-            results = self.search_jobs(
-                query=query,
-                location=location,
-                num_pages=max(1, max_results_per_location // 10)
-            )
-            
-            if "data" in results:
-                jobs = results["data"][:max_results_per_location]
+        async with aiohttp.ClientSession() as session:
+            async def search_location(location: str) -> List[Dict]:
+                async with semaphore:
+                    print(f"\n🌍 Searching in {location}...")
+                    jobs = await self._collect_jobs_async(
+                        session, max_results_per_location, query=query, location=location
+                    )
+                
                 for job in jobs:
                     job["search_location"] = location  # Add metadata
-                all_jobs.extend(jobs)
+                return jobs
+            
+            results = await asyncio.gather(*(search_location(location) for location in locations))
+        
+        # National postings often come back for several locations; keep the first copy
+        all_jobs = []
+        seen = set()
+        for jobs in results:
+            for job in jobs:
+                key = _job_dedupe_key(job)
+                if key not in seen:
+                    seen.add(key)
+                    all_jobs.append(job)
+        
+        return all_jobs
+    
+    def search_jobs_batched(self,
+                            query: str,
+                            locations: List[str],
+                            max_results_per_location: int = 10,
+                            country: str = "us") -> List[Dict]:
+        """
+        Search several locations with a single OR'd JSearch query
+        
+        Results are grouped client-side by matching job_city/job_state to each
+        requested location (city first, state only to break ties). The batched
+        query is capped at JSEARCH_MAX_PAGES; any location with fewer than
+        BATCH_MIN_LOCATION_HITS matches falls back to its own per-location search.
+        """
+        if not locations:
+            return []
+        
+        # Clamp here rather than letting the request silently drop pages; sparse locations are topped up below
+        num_pages = min(-(-len(locations) * max_results_per_location // JSEARCH_PAGE_SIZE), JSEARCH_MAX_PAGES)
+        results = self.search_jobs(
+            query=query,
+            location="|".join(locations),
+            num_pages=num_pages,
+            country=country
+        )
+        
+        jobs_by_location = {location: [] for location in locations}
+        for job in results.get("data", []):
+            location = self._match_job_location(job, locations)
+            if location is not None:
+                jobs_by_location[location].append(job)
+        
+        all_jobs = []
+        for location, jobs in jobs_by_location.items():
+            if len(jobs) < BATCH_MIN_LOCATION_HITS:
+                print(f"\n🌍 Batched search too sparse for {location}, searching separately...")
+                jobs = self._collect_jobs(max_results_per_location, query=query, location=location, country=country)
+            
+            jobs = jobs[:max_results_per_location]
+            for job in jobs:
+                job["search_location"] = location  # Add metadata
+            all_jobs.extend(jobs)
         
         return all_jobs
     
+    def _match_job_location(self, job: Dict, locations: List[str]) -> Optional[str]:
+        """
+        Pick the 'City, ST' style location a job belongs to, or None
+        
+        Cities are matched first across all locations; the state only breaks a
+        tie between same-named cities, or places a job whose city matched
+        nothing when exactly one location is in that state.
+        """
+        city = (job.get("job_city") or "").strip().lower()
+        state = (job.get("job_state") or "").strip().lower()
+        
+        city_matches = []
+        state_matches = []
+        for location in locations:
+            parts = [part.strip().lower() for part in location.split(",")]
+            state_match = bool(state) and len(parts) > 1 and parts[1] == state
+            if city and parts[0] == city:
+                city_matches.append((location, state_match))
+            elif state_match:
+                state_matches.append(location)
+        
+        if city_matches:
+            return next((location for location, state_match in city_matches if state_match), city_matches[0][0])
+        return state_matches[0] if len(state_matches) == 1 else None
+    
     def search_multiple_queries(self,
                                queries: List[str],
                                location: str = "United States",
@@ -161,17 +571,11 @@ class JSearchJobScraper:
         
         for query in queries:
             print(f"\n🔍 Searching for {query}...")
-            results = self.search_jobs(
-                query=query,
-                location=location,
-                num_pages=max(1, max_results_per_query // 10)
-            )
+            jobs = self._collect_jobs(max_results_per_query, query=query, location=location)
             
-            if "data" in results:
-                jobs = results["data"][:max_results_per_query]
-                for job in jobs:
-                    job["search_query"] = query  # Add metadata
-                all_jobs.extend(jobs)
+            for job in jobs:
+                job["search_query"] = query  # Add metadata
+            all_jobs.extend(jobs)
         
         return all_jobs
     
@@ -194,6 +598,11 @@ class JSearchJobScraper:
         """
         filtered_jobs = []
         
+        # Lowercase the filter terms once instead of on every job
+        excluded_lower = [excluded.lower() for excluded in filters.get("excluded_companies") or []]
+        keywords_lower = [keyword.lower() for keyword in filters.get("required_keywords") or []]
+        company_types_lower = [ct.lower() for ct in filters.get("company_types") or []]
+        
         for job in jobs:
             include_job = True
             
@@ -209,15 +618,15 @@ class JSearchJobScraper:
                     include_job = False
             
             # Company filter
-            if filters.get("excluded_companies"):
-                company = job.get("employer_name", "").lower()
-                if any(excluded.lower() in company for excluded in filters["excluded_companies"]):
+            if excluded_lower:
+                company = _normalize_company_name(job.get("employer_name", ""))[1]
+                if any(excluded in company for excluded in excluded_lower):
                     include_job = False
             
             # Keywords filter
-            if filters.get("required_keywords"):
+            if keywords_lower:
                 job_text = f"{job.get('job_title', '')} {job.get('job_description', '')}".lower()
-                if not any(keyword.lower() in job_text for keyword in filters["required_keywords"]):
+                if not any(keyword in job_text for keyword in keywords_lower):
                     include_job = False
             
             # Employee count filters
@@ -246,9 +655,9 @@ class JSearchJobScraper:
                     include_job = False
             
             # Company type filter
-            if filters.get("company_types"):
+            if company_types_lower:
                 company_type = job.get("employer_company_type", "").lower()
-                if company_type and not any(ct.lower() in company_type for ct in filters["company_types"]):
+                if company_type and not any(ct in company_type for ct in company_types_lower):
                     include_job = False
             
             if include_job:
@@ -292,29 +701,7 @@ class JSearchJobScraper:
     
     def _parse_employee_range(self, text: str) -> Optional[int]:
         """Parse employee count from text like '100-500', '1000+', 'small company'"""
-        import re
-        
-        text = text.lower()
-        
-        # Handle specific patterns
-        if "startup" in text or "small" in text:
-            return 50  # Assume small company
-        elif "enterprise" in text or "large" in text:
-            return 5000  # Assume large company
-        elif "medium" in text or "mid-size" in text:
-            return 500  # Assume medium company
-        
-        # Extract numbers from ranges like "100-500" or "1000+"
-        numbers = re.findall(r'\d+', text)
-        if numbers:
-            nums = [int(n) for n in numbers]
-            if len(nums) >= 2:
-                # Take average of range
-                return sum(nums) // len(nums)
-            elif len(nums) == 1:
-                return nums[0]
-        
-        return None
+        return _parse_employee_text(text)
     
     def _extract_review_count(self, job: Dict) -> Optional[int]:
         """Extract Google review count from job data"""
@@ -335,10 +722,9 @@ class JSearchJobScraper:
                         return value
                     elif isinstance(value, str):
                         # Extract number from strings like "150 reviews"
-                        import re
-                        numbers = re.findall(r'\d+', value)
+                        numbers = _scan_numbers(value)
                         if numbers:
-                            return int(numbers[0])
+                            return numbers[0]
                 except:
                     continue
         
@@ -376,8 +762,33 @@ class JSearchJobScraper:
     def save_results(self, jobs: List[Dict], filename: str = "jsearch_jobs.json"):
         """Save job results to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, indent=2, ensure_ascii=False)
+            if ORJSON_AVAILABLE:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(jobs))
+            else:
+                # Compact output; pretty-printing roughly doubles file size and encode time
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(jobs, f, ensure_ascii=False, separators=(',', ':'))
+            print(f"💾 Saved {len(jobs)} jobs to {filename}")
+        except Exception as e:
+            print(f"❌ Error saving results: {str(e)}")
+    
+    def save_parquet(self, jobs: List[Dict], filename: str = "jsearch_jobs.parquet"):
+        """Save job results to a zstd-compressed Parquet file for downstream analysis"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            # Use the union of keys across all jobs (from_pylist only looks at the first row)
+            columns = list(dict.fromkeys(key for job in jobs for key in job))
+            table = pa.Table.from_pydict({column: [job.get(column) for job in jobs] for column in columns})
+            pq.write_table(
+                table,
+                filename,
+                compression='zstd',
+                use_dictionary=True,
+                row_group_size=PARQUET_ROW_GROUP_SIZE
+            )
             print(f"💾 Saved {len(jobs)} jobs to {filename}")
         except Exception as e:
             print(f"❌ Error saving results: {str(e)}")
@@ -424,85 +835,10 @@ class JSearchJobScraper:
         Returns:
             List of company dictionaries with structured data
         """
-        companies = {}
-        company_jobs = {}
-        
-        for job in jobs_data:
-            company_name = job.get('employer_name', '').strip()
-            
-            if not company_name or company_name.lower() in ['unknown', 'not specified', 'n/a']:
-                continue
-                
-            # Use company name as key for deduplication
-            company_key = company_name.lower()
-            
-            if company_key not in companies:
-                # Extract company information
-                companies[company_key] = {
-                    'company_name': company_name,
-                    'company_website': job.get('employer_website', ''),
-                    'company_logo': job.get('employer_logo', ''),
-                    'company_type': job.get('employer_company_type', ''),
-                    'company_reviews': job.get('employer_reviews', ''),
-                    'company_rating': job.get('employer_rating', ''),
-                    'glassdoor_rating': job.get('employer_glassdoor_rating', ''),
-                    'company_size': job.get('employer_employees', '') or job.get('employer_size', ''),
-                    'headquarters': job.get('employer_headquarters', ''),
-                    'industry': job.get('employer_industry', ''),
-                    'founded_year': job.get('employer_founded', ''),
-                    'description': job.get('employer_description', ''),
-                    'job_count': 0,
-                    'job_titles': [],
-                    'job_locations': set(),
-                    'salary_ranges': [],
-                    'job_links': [],
-                    'first_seen_date': job.get('job_posted_at_datetime_utc', ''),
-                    'last_seen_date': job.get('job_posted_at_datetime_utc', ''),
-                    'employment_types': set(),
-                    'experience_levels': set()
-                }
-                company_jobs[company_key] = []
-            
-            # Update company statistics
-            companies[company_key]['job_count'] += 1
-            company_jobs[company_key].append(job)
-            
-            # Collect job information
-            if job.get('job_title'):
-                companies[company_key]['job_titles'].append(job['job_title'])
-            
-            # Location information
-            location_parts = []
-            if job.get('job_city'): location_parts.append(job['job_city'])
-            if job.get('job_state'): location_parts.append(job['job_state'])
-            if job.get('job_country'): location_parts.append(job['job_country'])
-            if location_parts:
-                companies[company_key]['job_locations'].add(', '.join(location_parts))
-            
-            # Salary information
-            salary_min = job.get('job_salary_min')
-            salary_max = job.get('job_salary_max')
-            salary_currency = job.get('job_salary_currency', 'USD')
-            
-            if salary_min or salary_max:
-                salary_range = f"{salary_min or 'N/A'} - {salary_max or 'N/A'} {salary_currency}"
-                companies[company_key]['salary_ranges'].append(salary_range)
-            
-            # Job links
-            if job.get('job_apply_link'):
-                companies[company_key]['job_links'].append(job['job_apply_link'])
-            
-            # Employment types and experience
-            if job.get('job_employment_type'):
-                companies[company_key]['employment_types'].add(job['job_employment_type'])
-            
-            if job.get('job_required_experience'):
-                companies[company_key]['experience_levels'].add(job['job_required_experience'])
-            
-            # Update last seen date
-            job_date = job.get('job_posted_at_datetime_utc', '')
-            if job_date and job_date > companies[company_key]['last_seen_date']:
-                companies[company_key]['last_seen_date'] = job_date
+        if len(jobs_data) < PARALLEL_EXTRACTION_THRESHOLD:
+            companies = _aggregate_company_shard(jobs_data)
+        else:
+            companies = self._aggregate_companies_parallel(jobs_data)
         
         # Convert sets to strings and finalize data
         final_companies = []
@@ -534,6 +870,29 @@ class JSearchJobScraper:
         
         return final_companies
     
+    def _aggregate_companies_parallel(self, jobs_data: List[Dict]) -> Dict[str, Dict]:
+        """
+        Aggregate companies across worker processes for large job lists
+        
+        Jobs are sharded by company key so every company lands in exactly one
+        shard and the per-shard results can be merged without conflicts.
+        """
+        n_workers = os.cpu_count() or 1
+        if n_workers < 2:
+            return _aggregate_company_shard(jobs_data)
+        
+        shards = [[] for _ in range(n_workers)]
+        for job in jobs_data:
+            company_key = _normalize_company_name(job.get('employer_name', ''))[1]
+            shards[hash(company_key) % n_workers].append(job)
+        
+        companies = {}
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            for shard_companies in executor.map(_aggregate_company_shard, shards):
+                companies.update(shard_companies)
+        
+        return companies
+    
     def create_companies_excel(self, companies_data: List[Dict], search_query: str = "", search_location: str = "") -> bytes:
         """
         Create a professionally formatted Excel file for company data
@@ -604,10 +963,13 @@ class JSearchJobScraper:
                     column_data = pd.to_datetime(column_data, errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
                 elif data_col == 'description':
                     # Limit description length
-                    column_data = column_data.astype(str).apply(lambda x: x[:300] + '...' if len(str(x)) > 300 else x)
+                    column_data = column_data.astype(str)
+                    truncated = column_data.str.slice(0, 300)
+                    column_data = truncated.where(column_data.str.len() <= 300, truncated + '...')
                 elif data_col in ['company_rating', 'glassdoor_rating']:
                     # Format ratings
-                    column_data = column_data.apply(lambda x: f"{float(x):.1f}" if x and str(x) != 'nan' else '')
+                    ratings = pd.to_numeric(column_data, errors='coerce')
+                    column_data = ratings.round(1).astype(str).where(ratings.notna() & (ratings != 0), '')
                 
                 organized_data[excel_col] = column_data
             else:
@@ -623,10 +985,10 @@ class JSearchJobScraper:
             'Total Jobs Analyzed': [companies_df['job_count'].sum()],
             'Export Date': [pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')],
             'Data Source': ['JSearch API - Company Analysis'],
-            'With Websites': [len(excel_df[excel_df['Company Website'] != ''])],
-            'High Priority (Multiple Jobs)': [len(excel_df[excel_df['Priority'] == 'High'])],
+            'With Websites': [int((excel_df['Company Website'] != '').sum())],
+            'High Priority (Multiple Jobs)': [int((excel_df['Priority'] == 'High').sum())],
             'Average Jobs per Company': [companies_df['job_count'].mean()],
-            'Companies with Ratings': [len(excel_df[(excel_df['Company Rating'] != '') | (excel_df['Glassdoor Rating'] != '')])]
+            'Companies with Ratings': [int(((excel_df['Company Rating'] != '') | (excel_df['Glassdoor Rating'] != '')).sum())]
         }
         metadata_df = pd.DataFrame(metadata)
         
@@ -641,20 +1003,22 @@ class JSearchJobScraper:
             
             # Write company statistics
             stats_data = {
-                'Company Size Distribution': companies_df['company_size'].value_counts().head(10).to_dict(),
-                'Industry Distribution': companies_df['industry'].value_counts().head(10).to_dict(),
-                'Employment Types': companies_df['employment_types'].str.split('; ').explode().value_counts().head(10).to_dict()
+                'Company Size Distribution': companies_df['company_size'].value_counts().head(10),
+                'Industry Distribution': companies_df['industry'].value_counts().head(10),
+                'Employment Types': companies_df['employment_types'].str.split('; ').explode().value_counts().head(10)
             }
             
-            # Convert stats to DataFrame format
-            stats_rows = []
-            for category, data in stats_data.items():
-                for item, count in data.items():
-                    if item and str(item) != 'nan':
-                        stats_rows.append({'Category': category, 'Item': item, 'Count': count})
+            # Convert stats to DataFrame format in one concat instead of row by row
+            stats_df = pd.concat(
+                [
+                    counts.rename_axis('Item').reset_index(name='Count').assign(Category=category)
+                    for category, counts in stats_data.items()
+                ],
+                ignore_index=True
+            )[['Category', 'Item', 'Count']]
+            stats_df = stats_df[stats_df['Item'].astype(bool) & (stats_df['Item'].astype(str) != 'nan')]
             
-            if stats_rows:
-                stats_df = pd.DataFrame(stats_rows)
+            if not stats_df.empty:
                 stats_df.to_excel(writer, sheet_name='Company_Statistics', index=False)
             
             # Format the main sheet
@@ -685,9 +1049,9 @@ class JSearchJobScraper:
 
 
 # Job search templates for common use cases
-JOB_TEMPLATES = {
+_JOB_TEMPLATES = {
     "tech_remote": {
-        "queries": ["software engineer", "python developer", "data scientist", "frontend developer"],
+        "queries": ("software engineer", "python developer", "data scientist", "frontend developer"),
         "location": "remote",
         "employment_types": "FULLTIME",
         "remote_jobs_only": True,
@@ -695,7 +1059,7 @@ JOB_TEMPLATES = {
     },
     
     "linkedin_tech": {
-        "queries": ["software engineer", "backend developer", "full stack developer"],
+        "queries": ("software engineer", "backend developer", "full stack developer"),
         "location": "United States",
         "employment_types": "FULLTIME,PARTTIME",
         "date_posted": "week",
@@ -703,7 +1067,7 @@ JOB_TEMPLATES = {
     },
     
     "indeed_jobs": {
-        "queries": ["data scientist", "data engineer", "machine learning engineer"],
+        "queries": ("data scientist", "data engineer", "machine learning engineer"),
         "location": "United States", 
         "employment_types": "FULLTIME",
         "date_posted": "week",
@@ -711,7 +1075,7 @@ JOB_TEMPLATES = {
     },
     
     "glassdoor_salary": {
-        "queries": ["senior software engineer", "staff engineer", "principal engineer"],
+        "queries": ("senior software engineer", "staff engineer", "principal engineer"),
         "location": "San Francisco, CA",
         "employment_types": "FULLTIME",
         "job_requirements": "more_than_3_years_experience",
@@ -719,7 +1083,7 @@ JOB_TEMPLATES = {
     },
     
     "entry_level": {
-        "queries": ["junior developer", "entry level engineer", "software engineer intern"],
+        "queries": ("junior developer", "entry level engineer", "software engineer intern"),
         "location": "United States",
         "employment_types": "FULLTIME,INTERN",
         "job_requirements": "under_3_years_experience,no_experience",
@@ -727,6 +1091,11 @@ JOB_TEMPLATES = {
     }
 }
 
+# Read-only views so no caller can change a template for everyone else
+JOB_TEMPLATES = MappingProxyType({
+    name: MappingProxyType(template) for name, template in _JOB_TEMPLATES.items()
+})
+
 
 # Example usage and testing
 if __name__ == "__main__":
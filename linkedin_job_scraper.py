@@ -2,21 +2,139 @@
 
 import os
 import json
+import base64
 import time
-import requests
-import pandas as pd
-from typing import Dict, List, Any, Optional, Callable
-from io import BytesIO
-from urllib.parse import quote_plus
-from datetime import datetime
+import asyncio
+import aiohttp
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from urllib.parse import urlencode
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from search_cache import SearchCache
+
+# orjson is optional; fall back to the standard library json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Connection pool size and idle keep-alive for the Apify HTTP session
+HTTP_POOL_SIZE = 100
+HTTP_KEEPALIVE_SECONDS = 60
+
+# Runs up to this many items use the run-sync endpoint instead of polling
+RUN_SYNC_MAX_ITEMS = 100
+
+# A run-sync call that fails after reaching Apify may still have started a run; it is
+# looked up among this many latest runs, started no earlier than the call minus the skew
+RUN_LOOKUP_LIMIT = 10
+RUN_LOOKUP_CLOCK_SKEW = timedelta(seconds=60)
+
+# Status poll back-off bounds in seconds
+POLL_INITIAL_DELAY = 1
+POLL_MAX_DELAY = 10
+
+# Seconds to wait for a completion webhook before polling; kept well under the
+# 300s run deadline so a webhook that never arrives still leaves time to poll
+WEBHOOK_WAIT_SECONDS = 60
+
+# Run ids whose webhook arrived before anything waited on them; late webhooks
+# for runs nobody waits on any more also land here, so the set is bounded
+EARLY_WEBHOOK_MAX_RUNS = 256
+
+# Seconds a verified working actor is reused before probing again
+ACTOR_CACHE_TTL = 3600
+
+# Rows per Parquet row group when exporting results
+PARQUET_ROW_GROUP_SIZE = 50000
+
+# Job lists at or above this size are summarized with pandas
+STATS_DATAFRAME_MIN_JOBS = 200
+
+# Flat columns split out of "City, State, Country" job locations
+LOCATION_PARTS = ('city', 'state', 'country')
+
+# LinkedIn field mappings: output field -> raw actor keys, in priority order
+FIELD_MAP = {
+    "job_title": ("title", "jobTitle", "positionName"),
+    "company_name": ("companyName", "company"),
+    "job_location": ("location", "jobLocation", "formattedLocation"),
+    "apply_url": ("applyUrl", "jobUrl", "url"),
+    "job_description": ("description", "jobDescription"),
+    "posted_date": ("postedAt", "publishedAt", "datePosted"),
+    "salary_info": ("salary", "salaryRange"),
+    "employment_type": ("employmentType", "jobType"),
+    "experience_level": ("seniorityLevel", "experienceLevel"),
+    "company_rating": ("companyRating", "rating")
+}
+
+# LinkedIn seniority codes -> display names
+EXPERIENCE_LEVEL_NAMES = {
+    "1": "Internship",
+    "2": "Entry level",
+    "3": "Associate",
+    "4": "Mid-Senior level",
+    "5": "Director",
+    "6": "Executive"
+}
+
+# Extra relevance terms applied to medical/billing searches
+MEDICAL_TERMS = ('medical', 'billing', 'healthcare', 'health', 'clinic', 'hospital', 'patient', 'coding', 'claims')
+
+
+def _field_text(value: Any) -> Optional[str]:
+    """Convert a single raw LinkedIn field value to text, or None if unusable"""
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    elif isinstance(value, list) and value:
+        return str(value[0])
+    elif isinstance(value, dict) and "text" in value:
+        return str(value["text"])
+    elif isinstance(value, dict) and "name" in value:
+        # Nested company objects, e.g. {"name": ..., "url": ..., "rating": ...}
+        return str(value["name"])
+    return None
+
+
+def _dedupe_jobs(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeated postings, keyed on normalized title, company and location"""
+    unique_jobs = []
+    seen = set()
+    
+    for job in jobs:
+        key = (
+            job.get('job_title', '').strip().lower(),
+            job.get('company_name', '').strip().lower(),
+            job.get('job_location', '').strip().lower()
+        )
+        if key not in seen:
+            seen.add(key)
+            unique_jobs.append(job)
+    
+    return unique_jobs
+
+
+# Completed searches shared by all scraper instances in this process
+_search_cache = SearchCache("lnkd")
+
 
 class LinkedInJobScraper:
     """Simplified and reliable LinkedIn job scraper using proven Apify actors"""
     
-    def __init__(self, api_key: str, debug: bool = False):
+    def __init__(self, api_key: str, debug: bool = False, use_cache: bool = True, webhook_url: str = None):
         self.api_key = api_key
         self.base_url = "https://api.apify.com/v2"
         self.debug = debug
+        self.use_cache = use_cache
+        
+        # When set, Apify POSTs run completion here and handle_webhook() wakes the waiting scrape
+        self.webhook_url = webhook_url or os.getenv("APIFY_WEBHOOK_URL")
+        self._run_events: Dict[str, asyncio.Event] = {}
+        self._early_webhooks: "OrderedDict[str, None]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Proven working LinkedIn actors
         self.actors = {
@@ -25,42 +143,79 @@ class LinkedInJobScraper:
             "alternative": "dhrumil~linkedin-jobs-scraper"
         }
         
-        # Setup session for reliability
-        self.session = requests.Session()
-        self.session.headers.update({
+        # HTTP session is created lazily inside the running event loop
+        self.headers = {
             'User-Agent': 'LinkedInJobScraper/2.0',
             'Accept': 'application/json',
             'Content-Type': 'application/json'
-        })
+        }
+        self.session: Optional[aiohttp.ClientSession] = None
+        
+        # (actor_id, time.monotonic() when it was verified)
+        self._actor_cache: Optional[Tuple[str, float]] = None
     
     def debug_log(self, message: str):
         """Log debug messages"""
         if self.debug:
             print(f"🔍 DEBUG: {message}")
     
-    def test_actor(self, actor_id: str) -> bool:
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared aiohttp session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            # Keep connections to api.apify.com alive across the polling loop
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_SIZE,
+                keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self.session
+    
+    async def close(self):
+        """Close the underlying HTTP session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+    
+    def _run_sync(self, coro):
+        """Run a coroutine to completion and close the session afterwards"""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.close()
+        
+        return asyncio.run(runner())
+    
+    async def test_actor(self, actor_id: str) -> bool:
         """Test if actor is available"""
         try:
-            response = self.session.get(
+            async with self._get_session().get(
                 f"{self.base_url}/acts/{actor_id}",
                 params={"token": self.api_key},
-                timeout=10
-            )
-            return response.status_code == 200
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                return response.status == 200
         except:
             return False
     
-    def get_working_actor(self) -> str:
-        """Get first working LinkedIn actor"""
+    async def get_working_actor(self) -> str:
+        """Get first working LinkedIn actor, reusing the last answer for ACTOR_CACHE_TTL seconds"""
+        if self._actor_cache is not None:
+            actor_id, checked_at = self._actor_cache
+            if time.monotonic() - checked_at < ACTOR_CACHE_TTL:
+                return actor_id
+        
         for actor_type in ["primary", "fallback", "alternative"]:
             actor_id = self.actors.get(actor_type)
             if actor_id:
                 if self.debug:
                     print(f"🔍 Testing LinkedIn actor: {actor_id}")
                 
-                if self.test_actor(actor_id):
+                if await self.test_actor(actor_id):
                     if self.debug:
                         print(f"✅ Using working actor: {actor_id}")
+                    self._actor_cache = (actor_id, time.monotonic())
                     return actor_id
                 elif self.debug:
                     print(f"❌ Actor not available: {actor_id}")
@@ -83,11 +238,9 @@ class LinkedInJobScraper:
         
         # Remove quotes for URL encoding
         query_for_url = formatted_query.replace('"', '')
-        query_encoded = quote_plus(query_for_url)
-        location_encoded = quote_plus(location)
         
         # Create basic LinkedIn search URL
-        url = f"https://www.linkedin.com/jobs/search?keywords={query_encoded}&location={location_encoded}"
+        url = "https://www.linkedin.com/jobs/search?" + urlencode({"keywords": query_for_url, "location": location})
         
         if self.debug:
             print(f"📝 LinkedIn URL: {url}")
@@ -107,16 +260,91 @@ class LinkedInJobScraper:
                            job_functions: List[str] = None,
                            min_salary: int = None,
                            exact_match: bool = True,
+                           dedupe: bool = False,
                            progress_callback: Optional[Callable] = None,
                            status_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Main LinkedIn scraping method (blocking wrapper around scrape_linkedin_jobs_async)"""
+        return self._run_sync(self.scrape_linkedin_jobs_async(
+            query=query,
+            location=location,
+            max_items=max_items,
+            experience_level=experience_level,
+            employment_type=employment_type,
+            date_posted=date_posted,
+            company_size=company_size,
+            remote_filter=remote_filter,
+            industries=industries,
+            job_functions=job_functions,
+            min_salary=min_salary,
+            exact_match=exact_match,
+            dedupe=dedupe,
+            progress_callback=progress_callback,
+            status_callback=status_callback
+        ))
+    
+    async def scrape_many(self, queries: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run several LinkedIn searches concurrently
+        
+        Each entry in queries holds the keyword arguments for
+        scrape_linkedin_jobs_async. Failed searches are returned as exceptions
+        in their slot instead of cancelling the others.
+        """
+        return await asyncio.gather(
+            *[self.scrape_linkedin_jobs_async(**query) for query in queries],
+            return_exceptions=True
+        )
+    
+    async def scrape_linkedin_jobs_async(self,
+                                         query: str,
+                                         location: str = "United States",
+                                         max_items: int = 50,
+                                         experience_level: str = None,
+                                         employment_type: str = None,
+                                         date_posted: str = None,
+                                         company_size: str = None,
+                                         remote_filter: str = None,
+                                         industries: List[str] = None,
+                                         job_functions: List[str] = None,
+                                         min_salary: int = None,
+                                         exact_match: bool = True,
+                                         dedupe: bool = False,
+                                         progress_callback: Optional[Callable] = None,
+                                         status_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
         """Main LinkedIn scraping method"""
         
         if status_callback:
             status_callback(f"🔍 Starting LinkedIn job search...")
         
+        # Identical searches are answered from the cache instead of re-running the actor
+        cache_key = None
+        if self.use_cache:
+            cache_key = _search_cache.make_key({
+                "query": query.strip().lower(),
+                "location": location.strip().lower(),
+                "max_items": max_items,
+                "experience_level": experience_level,
+                "employment_type": employment_type,
+                "date_posted": date_posted,
+                "company_size": company_size,
+                "remote_filter": remote_filter,
+                "industries": industries,
+                "job_functions": job_functions,
+                "min_salary": min_salary,
+                "exact_match": exact_match,
+                "dedupe": dedupe
+            })
+            cached_jobs = await _search_cache.aget(cache_key)
+            if cached_jobs is not None:
+                if progress_callback:
+                    progress_callback(1.0)
+                if status_callback:
+                    status_callback(f"✅ Found {len(cached_jobs)} relevant LinkedIn jobs (cached)")
+                return cached_jobs
+        
         try:
             # Get working actor
-            actor_id = self.get_working_actor()
+            actor_id = await self.get_working_actor()
             
             if progress_callback:
                 progress_callback(0.1)
@@ -137,145 +365,17 @@ class LinkedInJobScraper:
             if status_callback:
                 status_callback(f"🚀 Starting LinkedIn scraper...")
             
-            # Start actor run
-            response = self.session.post(
-                f"{self.base_url}/acts/{actor_id}/runs",
-                params={"token": self.api_key},
-                json=run_input,
-                timeout=30
-            )
-            
-            if response.status_code != 201:
-                raise Exception(f"Failed to start LinkedIn actor: HTTP {response.status_code}")
-            
-            run_data = response.json()
-            run_id = run_data["data"]["id"]
-            
-            if progress_callback:
-                progress_callback(0.2)
-            
-            if status_callback:
-                status_callback(f"⏳ Waiting for LinkedIn results... (Run ID: {run_id})")
+            # Small runs use the run-sync endpoint, which returns the items directly
+            raw_results = None
+            if max_items <= RUN_SYNC_MAX_ITEMS:
+                raw_results = await self._run_actor_sync(actor_id, run_input, progress_callback, status_callback)
             
-            # Wait for completion
-            max_wait = 300  # 5 minutes
-            waited = 0
-            
-            while waited < max_wait:
-                status_response = self.session.get(
-                    f"{self.base_url}/acts/{actor_id}/runs/{run_id}",
-                    params={"token": self.api_key},
-                    timeout=10
-                )
-                
-                if status_response.status_code == 200:
-                    run_info = status_response.json()["data"]
-                    status = run_info["status"]
-                    
-                    if status == "SUCCEEDED":
-                        break
-                    elif status in ["FAILED", "ABORTED"]:
-                        error_msg = run_info.get("statusMessage", f"Run {status.lower()}")
-                        raise Exception(f"LinkedIn scraping {status.lower()}: {error_msg}")
-                    
-                    # Update progress
-                    if progress_callback:
-                        progress = 0.2 + (waited / max_wait) * 0.6
-                        progress_callback(min(progress, 0.8))
-                
-                time.sleep(10)
-                waited += 10
-            
-            if waited >= max_wait:
-                raise TimeoutError("LinkedIn scraping timed out")
-            
-            if progress_callback:
-                progress_callback(0.9)
-            
-            if status_callback:
-                status_callback("📥 Fetching LinkedIn results...")
-            
-            # Get results with multiple fallback methods
-            raw_results = []
-            
-            # Method 1: Standard dataset fetch
-            try:
-                results_response = self.session.get(
-                    f"{self.base_url}/acts/{actor_id}/runs/{run_id}/dataset/items",
-                    params={"token": self.api_key, "format": "json"},
-                    timeout=30
-                )
-                
-                if results_response.status_code == 200:
-                    raw_results = results_response.json()
-                    if self.debug:
-                        print(f"✅ Method 1 successful: {len(raw_results)} results")
-                elif self.debug:
-                    print(f"⚠️ Method 1 failed: HTTP {results_response.status_code}")
-            except Exception as e:
-                if self.debug:
-                    print(f"⚠️ Method 1 error: {e}")
-            
-            # Method 2: Get dataset ID from run info and try that
-            if not raw_results:
-                try:
-                    run_info_response = self.session.get(
-                        f"{self.base_url}/acts/{actor_id}/runs/{run_id}",
-                        params={"token": self.api_key},
-                        timeout=10
-                    )
-                    
-                    if run_info_response.status_code == 200:
-                        run_info = run_info_response.json()["data"]
-                        dataset_id = run_info.get("defaultDatasetId")
-                        
-                        if dataset_id:
-                            dataset_response = self.session.get(
-                                f"{self.base_url}/datasets/{dataset_id}/items",
-                                params={"token": self.api_key, "format": "json"},
-                                timeout=30
-                            )
-                            
-                            if dataset_response.status_code == 200:
-                                raw_results = dataset_response.json()
-                                if self.debug:
-                                    print(f"✅ Method 2 successful with dataset {dataset_id}: {len(raw_results)} results")
-                            elif self.debug:
-                                print(f"⚠️ Method 2 dataset failed: HTTP {dataset_response.status_code}")
-                    elif self.debug:
-                        print(f"⚠️ Method 2 run info failed: HTTP {run_info_response.status_code}")
-                except Exception as e:
-                    if self.debug:
-                        print(f"⚠️ Method 2 error: {e}")
-            
-            # Method 3: Try key-value store
-            if not raw_results:
-                try:
-                    kv_response = self.session.get(
-                        f"{self.base_url}/key-value-stores/default/records/OUTPUT",
-                        params={"token": self.api_key},
-                        timeout=30
-                    )
-                    
-                    if kv_response.status_code == 200:
-                        kv_data = kv_response.json()
-                        if isinstance(kv_data, list):
-                            raw_results = kv_data
-                        elif isinstance(kv_data, dict) and "items" in kv_data:
-                            raw_results = kv_data["items"]
-                        
-                        if raw_results and self.debug:
-                            print(f"✅ Method 3 successful: {len(raw_results)} results")
-                    elif self.debug:
-                        print(f"⚠️ Method 3 failed: HTTP {kv_response.status_code}")
-                except Exception as e:
-                    if self.debug:
-                        print(f"⚠️ Method 3 error: {e}")
-            
-            if not raw_results:
-                raise Exception("Failed to fetch LinkedIn results using all available methods")
+            if raw_results is None:
+                raw_results = await self._run_actor_and_fetch(actor_id, run_input, progress_callback, status_callback)
             
             if not raw_results:
+                if self.debug:
+                    print("⚠️ No results from any fetch method")
                 if status_callback:
                     status_callback("⚠️ No LinkedIn jobs found")
                 return []
@@ -294,6 +394,9 @@ class LinkedInJobScraper:
             # Filter for relevance
             relevant_jobs = self.filter_relevant_jobs(processed_jobs, query)
             
+            if dedupe:
+                relevant_jobs = _dedupe_jobs(relevant_jobs)
+            
             if progress_callback:
                 progress_callback(1.0)
             
@@ -303,6 +406,9 @@ class LinkedInJobScraper:
             if self.debug:
                 print(f"📈 Processing: {len(raw_results)} → {len(processed_jobs)} → {len(relevant_jobs)}")
             
+            if cache_key is not None:
+                await _search_cache.aset(cache_key, relevant_jobs)
+            
             return relevant_jobs
             
         except Exception as e:
@@ -311,91 +417,458 @@ class LinkedInJobScraper:
                 status_callback(f"❌ {error_msg}")
             raise Exception(error_msg)
     
-    def process_results(self, raw_results: List[Dict]) -> List[Dict[str, Any]]:
-        """Process raw LinkedIn results into standardized format"""
-        processed_jobs = []
+    async def _run_actor_sync(self,
+                              actor_id: str,
+                              run_input: Dict[str, Any],
+                              progress_callback: Optional[Callable] = None,
+                              status_callback: Optional[Callable] = None) -> Optional[List[Dict]]:
+        """
+        Run the actor through Apify's run-sync-get-dataset-items endpoint
         
-        # LinkedIn field mappings
-        field_map = {
-            "job_title": ["title", "jobTitle", "positionName"],
-            "company_name": ["companyName", "company"],
-            "job_location": ["location", "jobLocation", "formattedLocation"],
-            "apply_url": ["applyUrl", "jobUrl", "url"],
-            "job_description": ["description", "jobDescription"],
-            "posted_date": ["postedAt", "publishedAt", "datePosted"],
-            "salary_info": ["salary", "salaryRange"],
-            "employment_type": ["employmentType", "jobType"],
-            "experience_level": ["seniorityLevel", "experienceLevel"],
-            "company_rating": ["companyRating", "rating"]
-        }
+        Returns the dataset items. If the call failed after Apify may have
+        started the run (timeout, 408, 5xx, unexpected body), that run is looked
+        up and waited on instead of starting a second, billed run. Returns None
+        only when no run was started, so the caller can start one.
+        """
+        requested_at = datetime.now(timezone.utc)
+        try:
+            async with self._get_session().post(
+                f"{self.base_url}/acts/{actor_id}/run-sync-get-dataset-items",
+                params={"token": self.api_key},
+                json=run_input,
+                timeout=aiohttp.ClientTimeout(total=310)
+            ) as response:
+                if response.status in (200, 201):
+                    raw_results = await response.json(content_type=None, loads=_json_loads)
+                    if isinstance(raw_results, list):
+                        if self.debug:
+                            print(f"✅ Sync run successful: {len(raw_results)} results")
+                        return raw_results
+                elif 400 <= response.status < 500 and response.status != 408:
+                    # Rejected before a run was created (bad input, auth, unknown actor)
+                    if self.debug:
+                        print(f"⚠️ Sync run rejected: HTTP {response.status}")
+                    return None
+                if self.debug:
+                    print(f"⚠️ Sync run failed: HTTP {response.status}")
+        except aiohttp.ClientConnectorError as e:
+            # Never reached Apify, so nothing was started
+            if self.debug:
+                print(f"⚠️ Sync run connection error: {e}")
+            return None
+        except Exception as e:
+            if self.debug:
+                print(f"⚠️ Sync run error: {e}")
         
-        for job_data in raw_results:
-            try:
-                processed_job = {"platform": "linkedin"}
+        run_id = await self._find_started_run(actor_id, run_input, requested_at)
+        if run_id is None:
+            return None
+        
+        if self.debug:
+            print(f"🔁 Continuing sync-started run {run_id}")
+        # The sync endpoint registers no completion webhook, so this run is only polled
+        return await self._wait_for_run_and_fetch(actor_id, run_id, progress_callback, status_callback,
+                                                  use_webhook=False)
+    
+    async def _find_started_run(self, actor_id: str, run_input: Dict[str, Any], requested_at: datetime) -> Optional[str]:
+        """Find the id of a run of actor_id started since requested_at with exactly run_input"""
+        session = self._get_session()
+        try:
+            async with session.get(
+                f"{self.base_url}/acts/{actor_id}/runs",
+                params={"token": self.api_key, "desc": "true", "limit": str(RUN_LOOKUP_LIMIT)},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status != 200:
+                    return None
+                runs = (await response.json(content_type=None, loads=_json_loads))["data"]["items"]
+            
+            earliest = requested_at - RUN_LOOKUP_CLOCK_SKEW
+            for run in runs:
+                started_at = run.get("startedAt")
+                if not started_at or datetime.fromisoformat(started_at.replace("Z", "+00:00")) < earliest:
+                    continue
                 
-                # Extract fields
-                for field, possible_keys in field_map.items():
-                    value = self.extract_field(job_data, possible_keys)
-                    processed_job[field] = value
+                # Concurrent searches share the actor; the stored input tells their runs apart
+                async with session.get(
+                    f"{self.base_url}/key-value-stores/{run['defaultKeyValueStoreId']}/records/INPUT",
+                    params={"token": self.api_key},
+                    timeout=aiohttp.ClientTimeout(total=10)
+                ) as input_response:
+                    if (input_response.status == 200
+                            and await input_response.json(content_type=None, loads=_json_loads) == run_input):
+                        return run["id"]
+        except Exception as e:
+            if self.debug:
+                print(f"⚠️ Run lookup error: {e}")
+        
+        return None
+    
+    async def _run_actor_and_fetch(self,
+                                   actor_id: str,
+                                   run_input: Dict[str, Any],
+                                   progress_callback: Optional[Callable] = None,
+                                   status_callback: Optional[Callable] = None) -> List[Dict]:
+        """Start an actor run, wait for it to finish and fetch its results"""
+        # Start actor run
+        status_code, run_data = await self._start_actor_run(actor_id, run_input)
+        
+        if status_code != 201:
+            # The cached actor may have gone away; re-probe once before giving up
+            self._actor_cache = None
+            actor_id = await self.get_working_actor()
+            status_code, run_data = await self._start_actor_run(actor_id, run_input)
+        
+        if status_code != 201:
+            raise Exception(f"Failed to start LinkedIn actor: HTTP {status_code}")
+        
+        return await self._wait_for_run_and_fetch(actor_id, run_data["data"]["id"], progress_callback, status_callback)
+    
+    async def _wait_for_run_and_fetch(self,
+                                      actor_id: str,
+                                      run_id: str,
+                                      progress_callback: Optional[Callable] = None,
+                                      status_callback: Optional[Callable] = None,
+                                      use_webhook: bool = True) -> List[Dict]:
+        """Wait for a started run to finish and fetch its results"""
+        if progress_callback:
+            progress_callback(0.2)
+        
+        if status_callback:
+            status_callback(f"⏳ Waiting for LinkedIn results... (Run ID: {run_id})")
+        
+        # Wait for the completion webhook first; polling below then only confirms the final status
+        max_wait = 300  # 5 minutes
+        waited = 0
+        if self.webhook_url and use_webhook:
+            waited = await self._wait_for_webhook(run_id, WEBHOOK_WAIT_SECONDS)
+        
+        # Wait for completion, backing off from POLL_INITIAL_DELAY to POLL_MAX_DELAY;
+        # the status is always checked at least once, even if the webhook used up the wait
+        delay = POLL_INITIAL_DELAY
+        
+        while True:
+            async with self._get_session().get(
+                f"{self.base_url}/acts/{actor_id}/runs/{run_id}",
+                params={"token": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as status_response:
+                run_info = (await status_response.json(content_type=None, loads=_json_loads))["data"] if status_response.status == 200 else None
+            
+            if run_info:
+                status = run_info["status"]
                 
-                # Format experience level
-                if processed_job["experience_level"]:
-                    exp_mapping = {
-                        "1": "Internship",
-                        "2": "Entry level", 
-                        "3": "Associate",
-                        "4": "Mid-Senior level",
-                        "5": "Director",
-                        "6": "Executive"
-                    }
-                    exp_level = processed_job["experience_level"]
-                    if exp_level in exp_mapping:
-                        processed_job["experience_level"] = exp_mapping[exp_level]
+                if status == "SUCCEEDED":
+                    break
+                elif status in ["FAILED", "ABORTED"]:
+                    error_msg = run_info.get("statusMessage", f"Run {status.lower()}")
+                    raise Exception(f"LinkedIn scraping {status.lower()}: {error_msg}")
                 
-                # Clean description
-                if processed_job["job_description"] and len(processed_job["job_description"]) > 500:
-                    processed_job["job_description"] = processed_job["job_description"][:500] + "..."
+                # Update progress
+                if progress_callback:
+                    progress = 0.2 + (waited / max_wait) * 0.6
+                    progress_callback(min(progress, 0.8))
+            
+            if waited >= max_wait:
+                raise TimeoutError("LinkedIn scraping timed out")
+            
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = min(delay * 1.5, POLL_MAX_DELAY)
+        
+        if progress_callback:
+            progress_callback(0.9)
+        
+        if status_callback:
+            status_callback("📥 Fetching LinkedIn results...")
+        
+        # Get results, racing the fallback methods against each other
+        return await self._fetch_first_results(actor_id, run_id)
+    
+    async def _wait_for_webhook(self, run_id: str, max_wait: float) -> float:
+        """Wait for handle_webhook() to report run_id finished, returning the seconds waited"""
+        self._loop = asyncio.get_running_loop()
+        if self._early_webhooks.pop(run_id, False) is None:
+            return 0.0
+        
+        event = self._run_events.setdefault(run_id, asyncio.Event())
+        started = time.monotonic()
+        
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if self.debug:
+                print(f"⚠️ No webhook received for run {run_id}, checking status directly")
+        finally:
+            self._run_events.pop(run_id, None)
+        
+        return time.monotonic() - started
+    
+    def handle_webhook(self, payload: Dict[str, Any]):
+        """
+        Handle an Apify run webhook payload posted to webhook_url
+        
+        Call this from the web server route that receives the webhook; it is
+        safe to call from another thread than the one running the scrape.
+        """
+        run_id = (payload.get("resource") or {}).get("id")
+        if not run_id:
+            return
+        
+        def mark_finished():
+            event = self._run_events.get(run_id)
+            if event is not None:
+                event.set()
+                return
+            
+            self._early_webhooks[run_id] = None
+            self._early_webhooks.move_to_end(run_id)
+            while len(self._early_webhooks) > EARLY_WEBHOOK_MAX_RUNS:
+                self._early_webhooks.popitem(last=False)
+        
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(mark_finished)
+        else:
+            mark_finished()
+    
+    def _webhook_param(self) -> str:
+        """Encode the run completion webhook for the runs endpoint's webhooks parameter"""
+        webhooks = [{
+            "eventTypes": ["ACTOR.RUN.SUCCEEDED", "ACTOR.RUN.FAILED", "ACTOR.RUN.ABORTED", "ACTOR.RUN.TIMED_OUT"],
+            "requestUrl": self.webhook_url
+        }]
+        return base64.b64encode(json.dumps(webhooks).encode()).decode()
+    
+    async def _start_actor_run(self, actor_id: str, run_input: Dict[str, Any]) -> Tuple[int, Optional[Dict]]:
+        """Start an actor run, returning the HTTP status and the response body on success"""
+        params = {"token": self.api_key}
+        if self.webhook_url:
+            params["webhooks"] = self._webhook_param()
+        
+        async with self._get_session().post(
+            f"{self.base_url}/acts/{actor_id}/runs",
+            params=params,
+            json=run_input,
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            if response.status != 201:
+                return response.status, None
+            return response.status, await response.json(content_type=None, loads=_json_loads)
+    
+    async def _fetch_first_results(self, actor_id: str, run_id: str) -> List[Dict]:
+        """
+        Race the run's own dataset fetches and return the first non-empty list
+        
+        Both methods read this run's dataset through independent endpoints, so
+        racing them bounds the wait by the slower one. The shared key-value store
+        is not tied to the run and may hold another run's output, so it is only
+        read once both come back empty.
+        """
+        tasks = [
+            asyncio.ensure_future(self._fetch_run_dataset(actor_id, run_id)),
+            asyncio.ensure_future(self._fetch_via_default_dataset_id(actor_id, run_id))
+        ]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                results = await next_done
+                if results:
+                    return results
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        return await self._fetch_kv_output()
+    
+    async def _fetch_run_dataset(self, actor_id: str, run_id: str) -> List[Dict]:
+        """Method 1: Standard dataset fetch"""
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/acts/{actor_id}/runs/{run_id}/dataset/items",
+                params={"token": self.api_key, "format": "jsonl"},
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as results_response:
+                if results_response.status == 200:
+                    raw_results = await self._read_jsonl_items(results_response)
+                    if self.debug:
+                        print(f"✅ Method 1 successful: {len(raw_results)} results")
+                    return raw_results
+                elif self.debug:
+                    print(f"⚠️ Method 1 failed: HTTP {results_response.status}")
+        except Exception as e:
+            if self.debug:
+                print(f"⚠️ Method 1 error: {e}")
+        
+        return []
+    
+    async def _fetch_via_default_dataset_id(self, actor_id: str, run_id: str) -> List[Dict]:
+        """Method 2: Get dataset ID from run info and fetch that dataset"""
+        session = self._get_session()
+        
+        try:
+            async with session.get(
+                f"{self.base_url}/acts/{actor_id}/runs/{run_id}",
+                params={"token": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as run_info_response:
+                if run_info_response.status != 200:
+                    if self.debug:
+                        print(f"⚠️ Method 2 run info failed: HTTP {run_info_response.status}")
+                    return []
                 
-                # Only keep jobs with basic info
-                if processed_job.get("job_title") or processed_job.get("company_name"):
-                    processed_jobs.append(processed_job)
+                dataset_id = (await run_info_response.json(content_type=None, loads=_json_loads))["data"].get("defaultDatasetId")
+            
+            if not dataset_id:
+                return []
+            
+            async with session.get(
+                f"{self.base_url}/datasets/{dataset_id}/items",
+                params={"token": self.api_key, "format": "jsonl"},
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as dataset_response:
+                if dataset_response.status == 200:
+                    raw_results = await self._read_jsonl_items(dataset_response)
+                    if self.debug:
+                        print(f"✅ Method 2 successful with dataset {dataset_id}: {len(raw_results)} results")
+                    return raw_results
+                elif self.debug:
+                    print(f"⚠️ Method 2 dataset failed: HTTP {dataset_response.status}")
+        except Exception as e:
+            if self.debug:
+                print(f"⚠️ Method 2 error: {e}")
+        
+        return []
+    
+    async def _read_jsonl_items(self, response: aiohttp.ClientResponse) -> List[Dict]:
+        """
+        Parse a format=jsonl dataset response line by line as chunks arrive
+        
+        Items reporting an error are dropped here instead of after the whole
+        dataset has been decoded.
+        """
+        items = []
+        pending = b""
+        
+        async for chunk in response.content.iter_any():
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                self._add_jsonl_item(items, line)
+        
+        self._add_jsonl_item(items, pending)
+        return items
+    
+    def _add_jsonl_item(self, items: List[Dict], line: bytes):
+        """Decode one JSONL line and keep it unless it is blank or an error item"""
+        line = line.strip()
+        if not line:
+            return
+        
+        item = _json_loads(line)
+        if isinstance(item, dict) and not item.get("error"):
+            items.append(item)
+    
+    async def _fetch_kv_output(self) -> List[Dict]:
+        """Method 3: Try key-value store"""
+        raw_results = []
+        
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/key-value-stores/default/records/OUTPUT",
+                params={"token": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as kv_response:
+                if kv_response.status == 200:
+                    kv_data = await kv_response.json(content_type=None, loads=_json_loads)
+                    if isinstance(kv_data, list):
+                        raw_results = kv_data
+                    elif isinstance(kv_data, dict) and "items" in kv_data:
+                        raw_results = kv_data["items"]
                     
-            except Exception as e:
-                if self.debug:
-                    print(f"⚠️ Error processing LinkedIn job: {e}")
-                continue
+                    if raw_results and self.debug:
+                        print(f"✅ Method 3 successful: {len(raw_results)} results")
+                elif self.debug:
+                    print(f"⚠️ Method 3 failed: HTTP {kv_response.status}")
+        except Exception as e:
+            if self.debug:
+                print(f"⚠️ Method 3 error: {e}")
+        
+        return raw_results
+    
+    def process_results(self, raw_results: List[Dict]) -> List[Dict[str, Any]]:
+        """Process raw LinkedIn results into standardized format"""
+        processed_jobs = []
+        
+        if not raw_results:
+            return processed_jobs
+        
+        # Imported here so loading the module (e.g. for JSON-only callers) stays light
+        import pandas as pd
+        
+        # object dtype keeps ints as ints (no 4 -> 4.0 upcast next to missing values)
+        df = pd.DataFrame(raw_results, dtype=object)
+        processed = pd.DataFrame({"platform": "linkedin"}, index=df.index)
         
-        return processed_jobs
+        # Extract fields by coalescing the alias columns left to right
+        for field, possible_keys in FIELD_MAP.items():
+            series = None
+            for key in possible_keys:
+                if key in df.columns:
+                    column = df[key].map(_field_text, na_action='ignore')
+                    series = column if series is None else series.fillna(column)
+            
+            processed[field] = series.fillna('').astype(str).str.strip() if series is not None else ''
+        
+        # Format experience level, keeping values that are not numeric codes
+        experience_level = processed["experience_level"]
+        processed["experience_level"] = experience_level.map(EXPERIENCE_LEVEL_NAMES).fillna(experience_level)
+        
+        # Clean description
+        description = processed["job_description"]
+        processed["job_description"] = description.where(
+            description.str.len() <= 500, description.str.slice(0, 500) + "..."
+        )
+        
+        # Flatten nested company/location data into top-level columns for columnar exports
+        rating = pd.to_numeric(processed["company_rating"], errors='coerce')
+        if "company" in df.columns:
+            nested_rating = df["company"].map(lambda value: value.get("rating") if isinstance(value, dict) else None)
+            rating = rating.fillna(pd.to_numeric(nested_rating, errors='coerce'))
+        processed["company_rating_num"] = rating.astype(object).where(rating.notna(), None)
+        
+        location_parts = processed["job_location"].str.split(",", n=2, expand=True).reindex(columns=range(3))
+        for position, part in enumerate(LOCATION_PARTS):
+            value = location_parts[position].fillna('').str.strip()
+            if "location" in df.columns:
+                nested_part = df["location"].map(lambda location: location.get(part) if isinstance(location, dict) else None)
+                value = nested_part.map(_field_text, na_action='ignore').fillna(value)
+            processed[part] = value
+        
+        # Only keep jobs with basic info
+        processed = processed[(processed["job_title"] != '') | (processed["company_name"] != '')]
+        
+        return processed.to_dict('records')
     
     def extract_field(self, data: Dict, possible_keys: List[str]) -> str:
         """Extract field value from job data"""
         for key in possible_keys:
-            try:
-                if '.' in key:
-                    # Handle nested keys
-                    parts = key.split('.')
-                    value = data
-                    for part in parts:
-                        if isinstance(value, dict) and part in value:
-                            value = value[part]
-                        else:
-                            value = None
-                            break
-                    
-                    if value is not None:
-                        return str(value).strip()
-                else:
-                    # Direct key access
-                    if key in data and data[key] is not None:
-                        value = data[key]
-                        if isinstance(value, (str, int, float)):
-                            return str(value).strip()
-                        elif isinstance(value, list) and value:
-                            return str(value[0]).strip()
-                        elif isinstance(value, dict) and "text" in value:
-                            return str(value["text"]).strip()
-            except:
-                continue
+            if '.' in key:
+                # Handle nested keys
+                parts = key.split('.')
+                value = data
+                for part in parts:
+                    if isinstance(value, dict) and part in value:
+                        value = value[part]
+                    else:
+                        value = None
+                        break
+                
+                if value is not None:
+                    return str(value).strip()
+            else:
+                # Direct key access
+                value = _field_text(data.get(key))
+                if value is not None:
+                    return value.strip()
         
         return ""
     
@@ -406,50 +879,37 @@ class LinkedInJobScraper:
         
         query_words = [word.lower().strip() for word in original_query.split() if len(word.strip()) > 2]
         
+        # Query-level values are computed once instead of on every job
+        query_lower = original_query.lower()
+        medical_terms = MEDICAL_TERMS if ('medical' in query_lower or 'billing' in query_lower) else ()
+        
         relevant_jobs = []
         
+        # Substring checks stay in plain Python: str.__contains__ outperforms
+        # np.char.find and Arrow's match_substring over whole columns here
         for job in jobs:
-            relevance_score = 0
-            
             job_title = job.get('job_title', '').lower()
             job_description = job.get('job_description', '').lower()
             company_name = job.get('company_name', '').lower()
             
-            # Score based on title matches (highest weight)
-            for word in query_words:
-                if word in job_title:
-                    relevance_score += 3
-            
-            # Score based on description matches
-            for word in query_words:
-                if word in job_description:
-                    relevance_score += 1
-            
-            # Score based on company name matches
-            for word in query_words:
-                if word in company_name:
-                    relevance_score += 1
+            # Title matches weigh highest, then description and company name
+            relevance_score = (
+                3 * sum(word in job_title for word in query_words)
+                + sum(word in job_description for word in query_words)
+                + sum(word in company_name for word in query_words)
+            )
             
             # Bonus for exact query match
-            if original_query.lower() in job_title:
+            if query_lower in job_title:
                 relevance_score += 5
             
             # Add medical/billing specific terms for relevance
-            if 'medical' in original_query.lower() or 'billing' in original_query.lower():
-                medical_terms = ['medical', 'billing', 'healthcare', 'health', 'clinic', 'hospital', 'patient', 'coding', 'claims']
-                for term in medical_terms:
-                    if term in job_title or term in job_description:
-                        relevance_score += 2
-            
-            # More lenient threshold for LinkedIn
-            min_threshold = 1 if len(query_words) == 1 else 1  # Lowered threshold
-            if relevance_score >= min_threshold:
+            relevance_score += 2 * sum(term in job_title or term in job_description for term in medical_terms)
+            
+            # More lenient threshold for LinkedIn; any query word in the title always qualifies
+            if relevance_score >= 1:
                 job['relevance_score'] = relevance_score
                 relevant_jobs.append(job)
-            elif any(word in job_title for word in query_words):
-                # Always include if any query word is in title
-                job['relevance_score'] = 1
-                relevant_jobs.append(job)
         
         # Sort by relevance
         relevant_jobs.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
@@ -461,22 +921,62 @@ class LinkedInJobScraper:
         if not jobs_data:
             return {"total_jobs": 0}
         
+        # Small result sets are cheaper to count in one plain pass than to load into pandas
+        if len(jobs_data) < STATS_DATAFRAME_MIN_JOBS:
+            companies = set()
+            with_salary = 0
+            for job in jobs_data:
+                company_name = job.get('company_name')
+                if company_name is not None:
+                    companies.add(company_name)
+                if job.get('salary_info') not in (None, ''):
+                    with_salary += 1
+            
+            return {
+                "total_jobs": len(jobs_data),
+                "unique_companies": len(companies),
+                "with_salary": with_salary,
+                "platforms": ["linkedin"]
+            }
+        
+        import pandas as pd
         df = pd.DataFrame(jobs_data)
         
         return {
-            "total_jobs": len(jobs_data),
-            "unique_companies": len(df['company_name'].dropna().unique()) if 'company_name' in df.columns else 0,
-            "with_salary": len(df[df['salary_info'] != '']) if 'salary_info' in df.columns else 0,
+            "total_jobs": len(df),
+            "unique_companies": int(df['company_name'].nunique(dropna=True)) if 'company_name' in df.columns else 0,
+            "with_salary": int((df['salary_info'].fillna('') != '').sum()) if 'salary_info' in df.columns else 0,
             "platforms": ["linkedin"]
         }
     
+    def save_parquet(self, jobs: List[Dict], filename: str = "linkedin_jobs.parquet"):
+        """Save job results to a zstd-compressed Parquet file for downstream analysis"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            # Use the union of keys across all jobs (from_pylist only looks at the first row)
+            columns = list(dict.fromkeys(key for job in jobs for key in job))
+            table = pa.Table.from_pydict({column: [job.get(column) for job in jobs] for column in columns})
+            pq.write_table(
+                table,
+                filename,
+                compression='zstd',
+                use_dictionary=True,
+                row_group_size=PARQUET_ROW_GROUP_SIZE
+            )
+            print(f"💾 Saved {len(jobs)} jobs to {filename}")
+        except Exception as e:
+            print(f"❌ Error saving results: {str(e)}")
+    
     def create_excel_report(self, jobs_data: List[Dict], search_query: str, search_location: str) -> Optional[bytes]:
         """Create Excel file with LinkedIn job data"""
         if not jobs_data:
             return None
         
         try:
-            df = pd.DataFrame(jobs_data)
+            from io import BytesIO
+            from openpyxl import Workbook
             
             # Clean column mapping
             columns = {
@@ -493,29 +993,28 @@ class LinkedInJobScraper:
                 'Relevance Score': 'relevance_score'
             }
             
-            excel_data = {}
-            for excel_col, data_col in columns.items():
-                if data_col in df.columns:
-                    excel_data[excel_col] = df[data_col]
-                else:
-                    excel_data[excel_col] = [''] * len(df)
+            # Stream rows straight into a write-only workbook (no intermediate DataFrame)
+            workbook = Workbook(write_only=True)
             
-            excel_df = pd.DataFrame(excel_data)
+            jobs_sheet = workbook.create_sheet('LinkedIn_Jobs')
+            jobs_sheet.append(list(columns.keys()))
+            for job in jobs_data:
+                jobs_sheet.append([job.get(data_col) for data_col in columns.values()])
             
             # Create metadata
-            metadata = pd.DataFrame({
-                'Search Query': [search_query],
-                'Location': [search_location],
-                'Platform': ['LinkedIn'],
-                'Total Jobs': [len(df)],
-                'Export Date': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-            })
+            info_sheet = workbook.create_sheet('Info')
+            info_sheet.append(['Search Query', 'Location', 'Platform', 'Total Jobs', 'Export Date'])
+            info_sheet.append([
+                search_query,
+                search_location,
+                'LinkedIn',
+                len(jobs_data),
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ])
             
             # Write to Excel
             output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                excel_df.to_excel(writer, sheet_name='LinkedIn_Jobs', index=False)
-                metadata.to_excel(writer, sheet_name='Info', index=False)
+            workbook.save(output)
             
             return output.getvalue()
             
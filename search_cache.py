@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import hashlib
+import asyncio
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Optional shared L2 tier; without it the cache is in-process only
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# orjson is optional; fall back to the standard library json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Seconds a result is served from the in-process L1 tier
+L1_TTL_SECONDS = 60
+
+# Seconds a result is kept in Redis
+L2_TTL_SECONDS = 300
+
+# Oldest L1 entries are evicted past this many searches
+L1_MAX_ENTRIES = 256
+
+
+class SearchCache:
+    """
+    Two-tier cache for completed job searches
+
+    L1 is a small in-process dict with a short TTL. L2 is Redis, used when
+    the redis package is installed and REDIS_URL is set, so workers share
+    results. Values are stored as JSON in both tiers so callers always get
+    a fresh copy they can modify.
+
+    Instances are shared by every session thread, so L1 is guarded by a lock.
+    Async callers use aget/aset, which run the blocking Redis calls in a
+    worker thread instead of on the event loop.
+    """
+
+    def __init__(self, namespace: str, redis_url: str = None,
+                 l1_ttl: int = L1_TTL_SECONDS, l2_ttl: int = L2_TTL_SECONDS):
+        self.namespace = namespace
+        self.l1_ttl = l1_ttl
+        self.l2_ttl = l2_ttl
+
+        # key -> (time.monotonic() expiry, JSON payload)
+        self._entries: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+        self.redis = None
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        if REDIS_AVAILABLE and redis_url:
+            try:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=1)
+            except Exception as e:
+                print(f"⚠️ Redis cache unavailable: {e}")
+
+    def make_key(self, params: Dict[str, Any]) -> str:
+        """Build a cache key from normalized search parameters"""
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        payload = self._get_local(key)
+        if payload is None:
+            payload = self._get_remote(key)
+        return _json_loads(payload) if payload is not None else None
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get for coroutines; a Redis lookup runs in a worker thread"""
+        payload = self._get_local(key)
+        if payload is None and self.redis is not None:
+            payload = await asyncio.to_thread(self._get_remote, key)
+        return _json_loads(payload) if payload is not None else None
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value in both tiers"""
+        payload = self._store_local(key, value)
+        self._set_remote(key, payload)
+
+    async def aset(self, key: str, value: Any):
+        """set for coroutines; the Redis write runs in a worker thread"""
+        payload = self._store_local(key, value)
+        if self.redis is not None:
+            await asyncio.to_thread(self._set_remote, key, payload)
+
+    def clear(self):
+        """Drop all in-process entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> Optional[str]:
+        """L1 payload for key, dropping it once expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if time.monotonic() < expires_at:
+                return payload
+            self._entries.pop(key, None)
+            return None
+
+    def _get_remote(self, key: str) -> Optional[str]:
+        """L2 payload for key, copied into L1 on a hit"""
+        if self.redis is None:
+            return None
+        try:
+            payload = self.redis.get(key)
+        except Exception as e:
+            print(f"⚠️ Redis cache read failed: {e}")
+            return None
+
+        if payload is None:
+            return None
+        payload = payload.decode() if isinstance(payload, bytes) else payload
+        self._put_local(key, payload)
+        return payload
+
+    def _set_remote(self, key: str, payload: str):
+        """Write a payload to L2"""
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(key, self.l2_ttl, payload)
+        except Exception as e:
+            print(f"⚠️ Redis cache write failed: {e}")
+
+    def _store_local(self, key: str, value: Any) -> str:
+        """Serialize value into L1 and return its JSON payload"""
+        payload = orjson.dumps(value, default=str).decode() if ORJSON_AVAILABLE else json.dumps(value, default=str)
+        self._put_local(key, payload)
+        return payload
+
+    def _put_local(self, key: str, payload: str):
+        """Insert into L1, evicting the oldest entry when full"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= L1_MAX_ENTRIES:
+                self._entries.pop(next(iter(self._entries)), None)
+            self._entries[key] = (time.monotonic() + self.l1_ttl, payload)
@@ -3,15 +3,56 @@ Enhanced AI Scraper with retry mechanism, concurrent processing, and better erro
 """
 import json
 import os
+import re
 import time
+import random
+import socket
+import hashlib
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import MappingProxyType
+from html import unescape
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Mapping, Optional, Callable
+from urllib.parse import unquote
 from dotenv import load_dotenv
 from scrapegraphai.graphs import SmartScraperGraph
 from ..utils.llm_services import get_service
 from ..utils.database import db_manager
+from ..utils.rate_limiter import HostRateLimiter, AdaptiveConcurrencyLimiter
+from ..utils.excel_export import dataframe_to_xlsx
+
+# orjson is optional; fall back to the standard library json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional on-disk cache of scrape results; without it every run re-scrapes every link
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# selectolax is optional; without it pages are reduced to text with regular expressions.
+# Its Lexbor backend replaced the deprecated selectolax.parser in 1.0
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+def _json_dumps(value) -> str:
+    """Compact UTF-8 JSON text for raw_response columns"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+    return json.dumps(value, ensure_ascii=False, default=str)
 
 load_dotenv()
 
@@ -20,6 +61,60 @@ MAX_CONCURRENT_SCRAPES = int(os.getenv("MAX_CONCURRENT_SCRAPES", "3"))
 SCRAPE_DELAY_SECONDS = float(os.getenv("SCRAPE_DELAY_SECONDS", "1.0"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))
 
+# Retry waits grow exponentially with jitter, capped, unless the server sends Retry-After
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+# Concurrent scrapes start at max_workers and adapt to observed latency within this cap
+MAX_ADAPTIVE_SCRAPES = int(os.getenv("MAX_ADAPTIVE_SCRAPES", "16"))
+
+# Per-link and per-attempt log lines are only printed when SCRAPER_VERBOSE is set
+VERBOSE = os.getenv("SCRAPER_VERBOSE", "").lower() in ("1", "true", "yes")
+
+# Progress and status callbacks fire about this many times per run
+PROGRESS_UPDATES = 100
+
+# Fetch page HTML over a shared aiohttp session, or a shared browser when that fails, and
+# hand it to the graph so it never launches its own browser; 0 leaves page loads to the graph
+PREFETCH_HTML = os.getenv("SCRAPE_PREFETCH_HTML", "1").lower() in ("1", "true", "yes")
+FETCH_TIMEOUT_SECONDS = 30
+FETCH_CONNECTIONS_PER_HOST = 10
+# Prefetch outcomes that mark a link dead, recorded at once with no browser, LLM call or retry
+DEAD_LINK_STATUS_CODES = (404, 410)
+DEAD_LINK_ERRORS = (socket.gaierror, ConnectionRefusedError)
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Prefetched pages whose mailto:/tel: links and visible emails add up to at least this
+# many contacts are answered without the LLM; 0 always calls the LLM
+REGEX_PREFILTER_MIN_HITS = int(os.getenv("REGEX_PREFILTER_MIN_HITS", "1"))
+
+# Spaces page loads to the same host; different hosts are fetched in parallel
+scrape_rate_limiter = HostRateLimiter(SCRAPE_DELAY_SECONDS)
+
+# Links are read from the database in pages of this size as workers free up
+LINK_PAGE_SIZE = 1000
+
+# Scraped contacts are written in one transaction per this many links, or once the
+# oldest unwritten row has waited this many seconds for the batch to fill
+CONTACT_INSERT_BATCH_SIZE = 25
+CONTACT_FLUSH_SECONDS = 2.0
+
+# Directory and lifetime for cached scrape results (same link, prompt and model)
+SCRAPE_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", ".scrape_cache")
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", str(7 * 86400)))
+
+# Column order for downloads, most readable first
+DOWNLOAD_COLUMN_ORDER = ('original_query', 'original_location', 'title', 'link',
+                         'scraped_names', 'scraped_phones', 'scraped_emails', 'scraping_status',
+                         'snippet', 'source', 'address_text', 'phone_number_serper',
+                         'rating', 'reviews_count', 'attributes', 'raw_response', 'scraped_at')
+
+# Low-cardinality download columns stored as pandas categoricals
+DOWNLOAD_CATEGORY_COLUMNS = ('scraping_status', 'source')
+
 # Get LLM service
 llm_service = get_service()
 
@@ -47,48 +142,54 @@ graph_config = {
     }
 }
 
-def extract_contact_details(scraped_result: Dict) -> Dict[str, Optional[str]]:
+# Candidate keys per contact field, most common first
+NAME_KEYS = ('names', 'name', 'contact_names', 'people', 'owners', 'staff')
+PHONE_KEYS = ('phone_numbers', 'phones', 'contact_phones', 'telephone', 'phone', 'tel')
+EMAIL_KEYS = ('email_addresses', 'emails', 'contact_emails', 'email', 'mail')
+
+# Shared read-only result for records with nothing usable; callers only read it
+EMPTY_CONTACTS = MappingProxyType({"scraped_names": None, "scraped_phones": None, "scraped_emails": None})
+
+# Row template for failed scrapes; copied per failure because the status differs
+FAILED_CONTACT_DATA = MappingProxyType({
+    'scraped_names': None,
+    'scraped_phones': None,
+    'scraped_emails': None,
+    'scraping_status': None,
+    'raw_response': None
+})
+
+def _failed_contact_data(status: str) -> Dict:
+    """Contact row recording a failed scrape"""
+    return {**FAILED_CONTACT_DATA, 'scraping_status': status}
+
+def _first(content: Dict, keys) -> object:
+    """Return the first truthy value among keys, stopping at the first hit"""
+    for key in keys:
+        value = content.get(key)
+        if value:
+            return value
+    return []
+
+def extract_contact_details(scraped_result: Dict) -> Mapping[str, Optional[str]]:
     """Extract contact details from scraped result into structured format"""
     if not scraped_result:
-        return {"scraped_names": None, "scraped_phones": None, "scraped_emails": None}
+        return EMPTY_CONTACTS
     
     try:
         # Handle both dict and JSON string formats
         if isinstance(scraped_result, str):
-            data = json.loads(scraped_result)
+            data = _json_loads(scraped_result)
         else:
             data = scraped_result
             
         # Extract from nested structure - try multiple possible keys
         content = data.get('content', data)
         
-        # Try different possible keys for names
-        names = (content.get('names', []) or 
-                content.get('name', []) or 
-                content.get('contact_names', []) or
-                content.get('people', []) or
-                content.get('owners', []) or
-                content.get('staff', []))
-        
-        # Try different possible keys for phones
-        phones = (content.get('phone_numbers', []) or 
-                 content.get('phones', []) or 
-                 content.get('contact_phones', []) or
-                 content.get('telephone', []) or
-                 content.get('phone', []) or
-                 content.get('tel', []))
-        
-        # Try different possible keys for emails
-        emails = (content.get('email_addresses', []) or 
-                 content.get('emails', []) or 
-                 content.get('contact_emails', []) or
-                 content.get('email', []) or
-                 content.get('mail', []))
-        
         # Ensure we have lists and clean data
-        names = _clean_contact_list(names)
-        phones = _clean_contact_list(phones)
-        emails = _clean_contact_list(emails)
+        names = _clean_contact_list(_first(content, NAME_KEYS))
+        phones = _clean_contact_list(_first(content, PHONE_KEYS))
+        emails = _clean_contact_list(_first(content, EMAIL_KEYS))
         
         return {
             "scraped_names": "; ".join(names) if names else None,
@@ -97,46 +198,262 @@ def extract_contact_details(scraped_result: Dict) -> Dict[str, Optional[str]]:
         }
     except Exception as e:
         print(f"  Warning: Could not parse contact details: {e}")
-        return {"scraped_names": None, "scraped_phones": None, "scraped_emails": None}
+        return EMPTY_CONTACTS
+
+# Placeholder values the LLM returns instead of leaving a field empty
+CONTACT_PLACEHOLDERS = frozenset(('none', 'null', 'n/a', ''))
 
 def _clean_contact_list(items) -> List[str]:
     """Clean and validate contact list items"""
     if not items:
         return []
     
-    if not isinstance(items, list):
-        items = [items] if items else []
+    items = items if isinstance(items, list) else [items]
     
-    # Clean and filter items
-    cleaned = []
+    # One str/strip per item; dict keys dedupe while keeping first-seen order
+    cleaned = {}
     for item in items:
-        if item and str(item).strip() and str(item).lower() not in ['none', 'null', 'n/a', '']:
-            cleaned.append(str(item).strip())
+        if item:
+            text = str(item).strip()
+            if text and text.lower() not in CONTACT_PLACEHOLDERS:
+                cleaned[text] = None
+    
+    return list(cleaned)
+
+# Prompt shared by every contact-extraction graph
+CONTACT_EXTRACTION_PROMPT = """Extract all contact details, including names, phone numbers, and email addresses, from all pages of the provided website, such as the homepage, About page, Contact Us page, footer, header, team pages, or any other relevant sections. Search for contact information in text, HTML attributes (e.g., 'mailto:' links, 'tel:' links), meta tags, and structured data (e.g., schema.org markup). Include contact details for individuals, organizations, or departments when available. Handle variations in formatting (e.g., phone numbers with or without country codes, emails in plain text or linked). Return the data in a structured JSON format with the following keys: `names`, `phone_numbers`, `email_addresses`, each containing a list of unique values. If no contact information is found for a category, return an empty list for that key. Exclude any irrelevant or duplicate entries, and ensure the data is clean and properly formatted.
+Example output:
+{
+"names": ["John Doe", "Jane Smith"],
+"phone_numbers": ["+1-555-123-4567", "800-555-7890"],
+"email_addresses": ["contact@example.com", "support@website.org"]
+}"""
+
+# One SmartScraperGraph per worker thread, re-pointed at each link instead of rebuilt
+_graph_local = threading.local()
+
+def _get_scraper_graph(link: str) -> SmartScraperGraph:
+    """Return this thread's SmartScraperGraph with its source set to link"""
+    graph = getattr(_graph_local, "graph", None)
+    if graph is None:
+        graph = SmartScraperGraph(prompt=CONTACT_EXTRACTION_PROMPT, source=link, config=graph_config)
+        _graph_local.graph = graph
+    else:
+        # Nodes and the LLM client are built once in __init__; run() only reads these two
+        graph.source = link
+        graph.input_key = "url" if link.startswith("http") else "local_dir"
+    return graph
+
+# Opened lazily so importing this module never touches the disk
+_scrape_cache = None
+_scrape_cache_lock = threading.Lock()
+
+def _get_scrape_cache():
+    """Return the shared on-disk scrape cache, or None when diskcache is not installed"""
+    global _scrape_cache
+    if not DISKCACHE_AVAILABLE:
+        return None
+    
+    with _scrape_cache_lock:
+        if _scrape_cache is None:
+            _scrape_cache = diskcache.Cache(SCRAPE_CACHE_PATH)
+    return _scrape_cache
+
+# Digest of everything besides the link that shapes a scrape result, computed once
+CONTACT_PROMPT_HASH = hashlib.blake2b(
+    "\0".join((graph_config["llm"]["model"], CONTACT_EXTRACTION_PROMPT)).encode(), digest_size=16
+).hexdigest()
+
+def _scrape_cache_key(link: str) -> str:
+    """Cache key covering everything that shapes a scrape result"""
+    return hashlib.sha256(f"{CONTACT_PROMPT_HASH}\0{link}".encode()).hexdigest()
+
+# Contact patterns in raw HTML, compiled once
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+MAILTO_RE = re.compile(r'mailto:([^"\'?>\s]+)', re.IGNORECASE)
+TEL_RE = re.compile(r'href=["\']tel:([^"\']+)["\']', re.IGNORECASE)
+
+# Asset names like logo@2x.png look like emails to EMAIL_RE
+ASSET_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.css', '.js')
+
+def _extract_contacts_from_html(html: str) -> Optional[Dict]:
+    """
+    Pull emails and phone numbers straight out of the HTML
+    
+    Returns a result shaped like the LLM's, or None when fewer than
+    REGEX_PREFILTER_MIN_HITS contacts were found and the LLM is still needed.
+    """
+    if REGEX_PREFILTER_MIN_HITS <= 0:
+        return None
+    
+    emails = {}
+    for match in MAILTO_RE.findall(html):
+        emails[unquote(match).strip().lower()] = None
+    for match in EMAIL_RE.findall(html):
+        if not match.lower().endswith(ASSET_SUFFIXES):
+            emails[match.lower()] = None
+    
+    phones = {}
+    for match in TEL_RE.findall(html):
+        phone = unquote(match).strip()
+        if sum(ch.isdigit() for ch in phone) >= 7:
+            phones[phone] = None
+    
+    if len(emails) + len(phones) < REGEX_PREFILTER_MIN_HITS:
+        return None
+    
+    return {
+        "names": [],
+        "phone_numbers": list(phones),
+        "email_addresses": list(emails),
+        "extracted_by": "regex"
+    }
+
+# Prefetched pages reach the LLM as visible text plus contact links, capped to about 8K tokens
+PAGE_TEXT_MAX_CHARS = 32000
+CONTACT_LINK_SELECTOR = 'a[href^="mailto:"], a[href^="tel:"]'
+HIDDEN_TAGS_RE = re.compile(r'<(script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+CONTACT_HREF_RE = re.compile(r'href=["\']((?:mailto|tel):[^"\']+)["\']', re.IGNORECASE)
+
+def _page_text(html: str, link: str) -> str:
+    """Compact text of a page for the LLM: visible text followed by its mailto:/tel: hrefs"""
+    if SELECTOLAX_AVAILABLE:
+        tree = HTMLParser(html)
+        hrefs = [node.attributes.get('href') or '' for node in tree.css(CONTACT_LINK_SELECTOR)]
+        tree.strip_tags(['script', 'style', 'noscript', 'template', 'svg'])
+        root = tree.body or tree.root
+        text = root.text(separator=' ') if root is not None else ''
+    else:
+        hrefs = CONTACT_HREF_RE.findall(html)
+        text = unescape(TAG_RE.sub(' ', HIDDEN_TAGS_RE.sub(' ', html)))
+    
+    text = " ".join(text.split())
+    links = " ".join(dict.fromkeys(unquote(href) for href in hrefs if href))
+    # Starts with a label rather than the page, so the graph never mistakes it for a URL
+    page = f"Page: {link}\nContact links: {links}\n\n{text}" if links else f"Page: {link}\n\n{text}"
+    return page[:PAGE_TEXT_MAX_CHARS]
+
+# Results of pages seen this process, by content fingerprint; oldest evicted past the limit
+PAGE_RESULT_MAX_ENTRIES = 1024
+_page_results: Dict[str, Dict] = {}
+_page_results_lock = threading.Lock()
+
+def _page_fingerprint(html: str) -> str:
+    """Digest of the page with whitespace normalized, so aliases of one page hash alike"""
+    normalized = " ".join(html.split())
+    return hashlib.blake2b(f"{CONTACT_PROMPT_HASH}\0{normalized}".encode(), digest_size=16).hexdigest()
+
+def _get_page_result(fingerprint: str) -> Optional[Dict]:
+    """Result already extracted from an identical page, from this process or the disk cache"""
+    with _page_results_lock:
+        result = _page_results.get(fingerprint)
+    if result is None:
+        cache = _get_scrape_cache()
+        if cache is not None:
+            result = cache.get(f"page:{fingerprint}")
+    return result
+
+def _store_page_result(fingerprint: str, result):
+    """Remember a page's extraction result under its fingerprint"""
+    with _page_results_lock:
+        _page_results.pop(fingerprint, None)
+        if len(_page_results) >= PAGE_RESULT_MAX_ENTRIES:
+            del _page_results[next(iter(_page_results))]
+        _page_results[fingerprint] = result
+    
+    cache = _get_scrape_cache()
+    if cache is not None:
+        cache.set(f"page:{fingerprint}", result, expire=SCRAPE_CACHE_TTL)
+
+def _is_cached(link: str) -> bool:
+    """Whether a cached scrape result exists for link"""
+    cache = _get_scrape_cache()
+    return cache is not None and _scrape_cache_key(link) in cache
+
+def _run_scraper_graph(link: str, force_rescrape: bool = False, html: Optional[str] = None):
+    """
+    Run the extraction graph for link, reusing a cached result unless force_rescrape is set
+    
+    When html is given the graph reads its text directly instead of loading link in the browser.
+    """
+    cache = _get_scrape_cache()
+    key = _scrape_cache_key(link) if cache is not None else None
+    
+    if cache is not None and not force_rescrape:
+        cached = cache.get(key)
+        if cached is not None:
+            if VERBOSE:
+                print(f"  Cache hit for: {link[:50]}...")
+            return cached
+    
+    # Contacts sitting in plain mailto:/tel: links don't need an LLM call
+    fingerprint = None
+    if html is not None:
+        regex_result = _extract_contacts_from_html(html)
+        if regex_result is not None:
+            return regex_result
+        
+        # Redirects, aliases and tracking-parameter variants often serve the same page
+        fingerprint = _page_fingerprint(html)
+        page_result = None if force_rescrape else _get_page_result(fingerprint)
+        if page_result is not None:
+            if VERBOSE:
+                print(f"  Same page already extracted, reusing for: {link[:50]}...")
+            if cache is not None:
+                cache.set(key, page_result, expire=SCRAPE_CACHE_TTL)
+            return page_result
+    
+    # Prefetched HTML was already paced; otherwise the browser is about to load the page
+    if html is None:
+        scrape_rate_limiter.wait(link)
+    result = _get_scraper_graph(_page_text(html, link) if html is not None else link).run()
     
-    return list(set(cleaned))  # Remove duplicates
+    # Only successful runs are cached; failures are retried on the next pass
+    if cache is not None:
+        cache.set(key, result, expire=SCRAPE_CACHE_TTL)
+    if fingerprint is not None:
+        _store_page_result(fingerprint, result)
+    return result
+
+def _error_status(error: Exception) -> Optional[int]:
+    """HTTP status carried by an LLM client or HTTP library exception, if any"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+def _is_retryable(error: Exception) -> bool:
+    """Retry rate limits, server errors and errors without a status (network, timeouts, parsing)"""
+    status = _error_status(error)
+    return status is None or status in RETRYABLE_STATUS_CODES
 
-def scrape_single_link_with_retry(link: str, search_result_id: int, max_retries: int = MAX_RETRIES) -> Dict:
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before the next attempt, honouring a numeric Retry-After header"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    retry_after = headers.get('Retry-After')
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), RETRY_MAX_DELAY)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    
+    # Jitter spreads out workers that failed together instead of waking them in lockstep
+    delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY)
+    return random.uniform(delay / 2, delay)
+
+def scrape_single_link_with_retry(link: str, search_result_id: int, max_retries: int = MAX_RETRIES,
+                                  force_rescrape: bool = False, html: Optional[str] = None) -> Dict:
     """Scrape a single link with retry mechanism"""
     for attempt in range(max_retries + 1):
         try:
-            print(f"  Attempt {attempt + 1}/{max_retries + 1} for: {link[:50]}...")
-            
-            smart_scraper_graph = SmartScraperGraph(
-                prompt="""Extract all contact details, including names, phone numbers, and email addresses, from all pages of the provided website, such as the homepage, About page, Contact Us page, footer, header, team pages, or any other relevant sections. Search for contact information in text, HTML attributes (e.g., 'mailto:' links, 'tel:' links), meta tags, and structured data (e.g., schema.org markup). Include contact details for individuals, organizations, or departments when available. Handle variations in formatting (e.g., phone numbers with or without country codes, emails in plain text or linked). Return the data in a structured JSON format with the following keys: `names`, `phone_numbers`, `email_addresses`, each containing a list of unique values. If no contact information is found for a category, return an empty list for that key. Exclude any irrelevant or duplicate entries, and ensure the data is clean and properly formatted.
-                Example output:
-                {
-                "names": ["John Doe", "Jane Smith"],
-                "phone_numbers": ["+1-555-123-4567", "800-555-7890"],
-                "email_addresses": ["contact@example.com", "support@website.org"]
-                }""",
-                source=link,
-                config=graph_config
-            )
+            if VERBOSE:
+                print(f"  Attempt {attempt + 1}/{max_retries + 1} for: {link[:50]}...")
             
-            result = smart_scraper_graph.run()
+            result = _run_scraper_graph(link, force_rescrape, html)
             
             # Store raw response
-            raw_response = json.dumps(result, ensure_ascii=False) if isinstance(result, dict) else str(result)
+            raw_response = _json_dumps(result) if isinstance(result, dict) else str(result)
             
             # Extract structured contact details
             contact_details = extract_contact_details(result)
@@ -150,99 +467,294 @@ def scrape_single_link_with_retry(link: str, search_result_id: int, max_retries:
                     'scraping_status': 'Success',
                     'raw_response': raw_response
                 },
-                'contact_details': contact_details
+                'contact_details': contact_details,
+                'regex_only': isinstance(result, dict) and result.get('extracted_by') == 'regex'
             }
             
         except Exception as e:
             error_msg = str(e)
             print(f"  ✗ Attempt {attempt + 1} failed: {error_msg}")
             
-            if attempt < max_retries:
-                wait_time = (attempt + 1) * 2  # Exponential backoff
-                print(f"  Waiting {wait_time} seconds before retry...")
+            if attempt < max_retries and _is_retryable(e):
+                wait_time = _retry_delay(e, attempt)
+                print(f"  Waiting {wait_time:.1f} seconds before retry...")
                 time.sleep(wait_time)
             else:
                 return {
                     'success': False,
-                    'contact_data': {
-                        'scraped_names': None,
-                        'scraped_phones': None,
-                        'scraped_emails': None,
-                        'scraping_status': f"Error after {max_retries + 1} attempts: {error_msg}",
-                        'raw_response': None
-                    },
+                    'contact_data': _failed_contact_data(f"Error after {attempt + 1} attempts: {error_msg}"),
                     'error': error_msg
                 }
 
-def process_links_concurrent(progress_callback=None, status_callback=None, max_workers: int = MAX_CONCURRENT_SCRAPES, user_id: int = None):
-    """Process links with concurrent execution for better performance"""
+def _iter_unscraped_links(user_id: Optional[int]):
+    """Yield (id, link) pairs with a usable link, one database page at a time"""
+    after_id = 0
+    while True:
+        page = db_manager.get_unscraped_link_page(user_id, after_id, LINK_PAGE_SIZE)
+        if not page:
+            return
+        yield from page
+        after_id = page[-1][0]
+
+def _should_report(done: int, total: int) -> bool:
+    """Throttle UI callbacks to about PROGRESS_UPDATES per run, always including the last"""
+    return done >= total or done % max(1, total // PROGRESS_UPDATES) == 0
+
+def _queue_contact(pending_contacts: List, search_result_id: int, contact_data: Dict):
+    """Queue a contact row, writing the batch once it reaches CONTACT_INSERT_BATCH_SIZE"""
+    pending_contacts.append((search_result_id, contact_data))
+    if len(pending_contacts) >= CONTACT_INSERT_BATCH_SIZE:
+        db_manager.insert_scraped_contacts_bulk(pending_contacts)
+        pending_contacts.clear()
+
+class _LinkUnreachable(Exception):
+    """The prefetch showed the link is dead, so scraping it can only fail"""
+
+class _PageFetcher:
+    """
+    Fetches page HTML for one run: plain HTTP first over a pooled aiohttp session,
+    then a shared headless Chromium for pages that plain HTTP cannot load
     
-    # Get unscraped links from database
-    data = db_manager.get_unscraped_links(user_id)
+    The browser is launched on first use and each page gets its own context, so a
+    run pays for one Chromium start instead of one per link.
+    """
     
-    if data.empty:
-        print("No unscraped links found in database")
-        return 0
+    def __init__(self, max_connections: int):
+        connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=FETCH_CONNECTIONS_PER_HOST, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(connector=connector, headers=FETCH_HEADERS,
+                                             timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT_SECONDS))
+        self._browser_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_unavailable = False
     
-    print(f"Found {len(data)} unscraped links in database")
-    print(f"Processing with {max_workers} concurrent workers")
+    async def fetch(self, link: str) -> Optional[str]:
+        """Page HTML for link, or None so the graph loads it itself; raises _LinkUnreachable for dead links"""
+        html = await self._fetch_http(link)
+        if html is None:
+            html = await self._fetch_browser(link)
+        return html
     
-    total_links = len(data)
-    successful_extractions = 0
-    processed = 0
+    async def _fetch_http(self, link: str) -> Optional[str]:
+        """Fetch link's HTML over HTTP, or None when it is not a plain HTML 200"""
+        await asyncio.sleep(scrape_rate_limiter.reserve(link))
+        try:
+            async with self.session.get(link) as response:
+                if response.status in DEAD_LINK_STATUS_CODES:
+                    raise _LinkUnreachable(f"HTTP {response.status}")
+                if response.status != 200 or 'html' not in response.headers.get('Content-Type', ''):
+                    return None
+                return await response.text(errors='replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            # DNS failures and refused connections surface as the connector error's os_error
+            os_error = getattr(e, 'os_error', None)
+            if isinstance(os_error, DEAD_LINK_ERRORS):
+                raise _LinkUnreachable(str(os_error) or type(os_error).__name__) from e
+            if VERBOSE:
+                print(f"  Prefetch failed for {link[:50]}: {e}")
+            return None
+    
+    async def _fetch_browser(self, link: str) -> Optional[str]:
+        """Render link in a fresh context of the shared browser"""
+        browser = await self._get_browser()
+        if browser is None:
+            return None
+        
+        await asyncio.sleep(scrape_rate_limiter.reserve(link))
+        context = await browser.new_context(user_agent=FETCH_HEADERS['User-Agent'])
+        try:
+            page = await context.new_page()
+            await page.goto(link, timeout=graph_config["playwright_config"]["timeout"], wait_until="domcontentloaded")
+            return await page.content()
+        except Exception as e:
+            if VERBOSE:
+                print(f"  Browser fetch failed for {link[:50]}: {e}")
+            return None
+        finally:
+            await context.close()
     
-    # Convert to list of tuples for easier processing
-    links_to_process = [(row['link'], row['id']) for _, row in data.iterrows() 
-                       if row['link'] and row['link'] != 'nan']
+    async def _get_browser(self):
+        """Launch the shared browser on first use; None if Playwright is unavailable"""
+        async with self._browser_lock:
+            if self._browser is None and not self._browser_unavailable:
+                try:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(
+                        headless=True, args=graph_config["playwright_config"]["args"]
+                    )
+                except Exception as e:
+                    print(f"  Shared browser unavailable, pages will load per link: {e}")
+                    self._browser_unavailable = True
+            return self._browser
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_link = {
-            executor.submit(scrape_single_link_with_retry, link, search_id): (link, search_id)
-            for link, search_id in links_to_process
-        }
+    async def close(self):
+        """Close the HTTP session and, if it was started, the browser"""
+        await self.session.close()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+async def _scrape_one(limiter: AdaptiveConcurrencyLimiter, fetcher: Optional[_PageFetcher],
+                      executor: ThreadPoolExecutor, link: str, search_result_id: int, force_rescrape: bool = False):
+    """Fetch one link and run its blocking extraction on the scrape pool once a concurrency slot is free"""
+    await limiter.acquire()
+    started = time.monotonic()
+    cached = False
+    try:
+        # Cached links need neither the page nor the LLM
+        cached = not force_rescrape and _is_cached(link)
+        html = None
+        if fetcher is not None and not cached:
+            html = await fetcher.fetch(link)
         
-        # Process completed tasks
-        for future in as_completed(future_to_link):
-            link, search_result_id = future_to_link[future]
+        result = await asyncio.get_running_loop().run_in_executor(
+            executor, partial(scrape_single_link_with_retry, link, search_result_id, MAX_RETRIES, force_rescrape, html))
+    except _LinkUnreachable as e:
+        # Dead links say nothing about how loaded the LLM and targets are
+        return link, search_result_id, {
+            'success': False,
+            'contact_data': _failed_contact_data(f"Unreachable: {e}"),
+            'error': f"Unreachable: {e}"
+        }
+    except Exception as e:
+        result = e
+    finally:
+        await limiter.release()
+    
+    # Cache hits and regex-only answers say nothing about how loaded the LLM and targets are
+    if isinstance(result, Exception) or not result['success']:
+        limiter.on_drop()
+    elif not cached and not result.get('regex_only'):
+        limiter.on_success(time.monotonic() - started)
+    return link, search_result_id, result
+
+async def _produce_links(link_queue: asyncio.Queue, user_id: Optional[int], worker_count: int):
+    """Page unscraped links from the database into the bounded queue, then stop every worker"""
+    after_id = 0
+    while True:
+        page = await asyncio.to_thread(db_manager.get_unscraped_link_page, user_id, after_id, LINK_PAGE_SIZE)
+        if not page:
+            break
+        for search_result_id, link in page:
+            # Blocks while the queue is full, so only a bounded number of rows is ever in memory
+            await link_queue.put((link, search_result_id))
+        after_id = page[-1][0]
+    
+    for _ in range(worker_count):
+        await link_queue.put(None)
+
+async def _scrape_worker(link_queue: asyncio.Queue, result_queue: asyncio.Queue, limiter: AdaptiveConcurrencyLimiter,
+                         fetcher: Optional[_PageFetcher], executor: ThreadPoolExecutor, force_rescrape: bool = False):
+    """Scrape queued links until the producer sends None"""
+    while True:
+        item = await link_queue.get()
+        if item is None:
+            return
+        link, search_result_id = item
+        await result_queue.put(await _scrape_one(limiter, fetcher, executor, link, search_result_id, force_rescrape))
+
+async def _process_links_async(user_id: Optional[int], total_links: int, max_workers: int,
+                               progress_callback=None, status_callback=None, force_rescrape: bool = False) -> int:
+    """Scrape links starting with max_workers in flight, adapting the cap as results finish"""
+    limiter = AdaptiveConcurrencyLimiter(max_workers, max_limit=max(max_workers, MAX_ADAPTIVE_SCRAPES))
+    
+    # One pooled session and at most one browser for every page fetch in the run
+    fetcher = _PageFetcher(limiter.max_limit) if PREFETCH_HTML else None
+    
+    # Blocking graph runs get their own pool with one thread per possible slot, so they neither
+    # queue behind nor starve the default executor that pages links from the database
+    executor = ThreadPoolExecutor(max_workers=limiter.max_limit, thread_name_prefix='scrape')
+    
+    # Producer -> bounded link queue -> workers -> result queue -> this coroutine
+    worker_count = limiter.max_limit
+    link_queue = asyncio.Queue(maxsize=worker_count * 4)
+    result_queue = asyncio.Queue()
+    tasks = [asyncio.create_task(_produce_links(link_queue, user_id, worker_count))]
+    tasks += [asyncio.create_task(_scrape_worker(link_queue, result_queue, limiter, fetcher, executor, force_rescrape))
+              for _ in range(worker_count)]
+    pipeline = asyncio.gather(*tasks)
+    # Wakes the writer loop once every worker is done or anything in the pipeline fails
+    pipeline.add_done_callback(lambda _: result_queue.put_nowait(None))
+    
+    successful_extractions = 0
+    processed = 0
+    pending_contacts = []
+    
+    try:
+        # This coroutine is the only database writer, so SQLite never sees concurrent writes
+        while True:
+            try:
+                # Waits at most CONTACT_FLUSH_SECONDS while rows are unwritten, so slow links never hold them back
+                item = await asyncio.wait_for(result_queue.get(), CONTACT_FLUSH_SECONDS if pending_contacts else None)
+            except asyncio.TimeoutError:
+                db_manager.insert_scraped_contacts_bulk(pending_contacts)
+                pending_contacts.clear()
+                continue
+            if item is None:
+                break
+            link, search_result_id, result = item
             processed += 1
             
-            progress = processed / total_links
-            if progress_callback:
-                progress_callback(progress)
-            if status_callback:
-                status_callback(f"Processing link {processed}/{total_links}: {link[:50]}...")
+            if _should_report(processed, total_links):
+                if progress_callback:
+                    progress_callback(processed / total_links)
+                if status_callback:
+                    status_callback(f"Processing link {processed}/{total_links}: {link[:50]}...")
             
-            try:
-                result = future.result()
-                
-                # Insert into database
-                db_manager.insert_scraped_contact(search_result_id, result['contact_data'])
-                
-                if result['success']:
-                    successful_extractions += 1
-                    contact_details = result['contact_details']
-                    print(f"  ✓ Extracted from {link[:50]}:")
-                    print(f"    Names: {contact_details['scraped_names']}")
-                    print(f"    Phones: {contact_details['scraped_phones']}")
-                    print(f"    Emails: {contact_details['scraped_emails']}")
-                else:
-                    print(f"  ✗ Failed to extract from {link[:50]}: {result.get('error', 'Unknown error')}")
-                
-                # Add delay between requests to respect rate limits
-                time.sleep(SCRAPE_DELAY_SECONDS)
-                
-            except Exception as e:
-                print(f"  ✗ Unexpected error processing {link}: {e}")
+            if isinstance(result, Exception):
+                print(f"  ✗ Unexpected error processing {link}: {result}")
                 # Still insert error record
-                error_data = {
-                    'scraped_names': None,
-                    'scraped_phones': None,
-                    'scraped_emails': None,
-                    'scraping_status': f"Unexpected error: {str(e)}",
-                    'raw_response': None
-                }
-                db_manager.insert_scraped_contact(search_result_id, error_data)
+                _queue_contact(pending_contacts, search_result_id, _failed_contact_data(f"Unexpected error: {str(result)}"))
+                continue
+            
+            # Queue for the next batched database write
+            _queue_contact(pending_contacts, search_result_id, result['contact_data'])
+            
+            if result['success']:
+                successful_extractions += 1
+                if VERBOSE:
+                    contact_details = result['contact_details']
+                    print(f"  ✓ Extracted from {link[:50]}:\n"
+                          f"    Names: {contact_details['scraped_names']}\n"
+                          f"    Phones: {contact_details['scraped_phones']}\n"
+                          f"    Emails: {contact_details['scraped_emails']}")
+            else:
+                print(f"  ✗ Failed to extract from {link[:50]}: {result.get('error', 'Unknown error')}")
+        
+        # Surfaces a producer failure such as a database error
+        await pipeline
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Flush the last partial batch, including whatever finished before an error
+        db_manager.insert_scraped_contacts_bulk(pending_contacts)
+        executor.shutdown(wait=False, cancel_futures=True)
+        if fetcher is not None:
+            await fetcher.close()
+    
+    return successful_extractions
+
+def process_links_concurrent(progress_callback=None, status_callback=None, max_workers: int = MAX_CONCURRENT_SCRAPES, user_id: int = None,
+                             force_rescrape: bool = False):
+    """Process links with concurrent execution for better performance"""
+    
+    # Only the count is read up front; links are streamed from the database in pages
+    total_links = db_manager.count_unscraped_links(user_id)
+    
+    if not total_links:
+        print("No unscraped links found in database")
+        return 0
+    
+    print(f"Found {total_links} unscraped links in database")
+    print(f"Processing with {max_workers} concurrent workers, adapting up to {max(max_workers, MAX_ADAPTIVE_SCRAPES)}")
+    
+    # Page loads and LLM calls block in worker threads; the event loop only schedules and records
+    successful_extractions = asyncio.run(
+        _process_links_async(user_id, total_links, max_workers, progress_callback, status_callback,
+                             force_rescrape)
+    )
     
     print(f"\n✓ Concurrent processing complete!")
     print(f"Processed {total_links} links total")
@@ -251,70 +763,79 @@ def process_links_concurrent(progress_callback=None, status_callback=None, max_w
     
     return successful_extractions
 
-def process_links_from_database(progress_callback=None, status_callback=None, use_concurrent=True, user_id: int = None):
-    """Process all unscraped links from the database with enhanced features"""
+def process_links_from_database(progress_callback=None, status_callback=None, use_concurrent=True, user_id: int = None,
+                                force_rescrape: bool = False):
+    """
+    Process all unscraped links from the database with enhanced features
+    
+    Links scraped within SCRAPE_CACHE_TTL reuse their cached result unless
+    force_rescrape is set.
+    """
     
     if use_concurrent and MAX_CONCURRENT_SCRAPES > 1:
-        return process_links_concurrent(progress_callback, status_callback, MAX_CONCURRENT_SCRAPES, user_id)
+        return process_links_concurrent(progress_callback, status_callback, MAX_CONCURRENT_SCRAPES, user_id,
+                                        force_rescrape)
     else:
         # Fallback to sequential processing
-        return _process_links_sequential(progress_callback, status_callback, user_id)
+        return _process_links_sequential(progress_callback, status_callback, user_id, force_rescrape)
 
-def _process_links_sequential(progress_callback=None, status_callback=None, user_id: int = None):
+def _process_links_sequential(progress_callback=None, status_callback=None, user_id: int = None,
+                              force_rescrape: bool = False):
     """Sequential processing fallback"""
-    data = db_manager.get_unscraped_links(user_id)
+    total_links = db_manager.count_unscraped_links(user_id)
     
-    if data.empty:
+    if not total_links:
         print("No unscraped links found in database")
         return 0
     
-    total_links = len(data)
     successful_extractions = 0
+    pending_contacts = []
     
-    for index, row in data.iterrows():
-        link = row['link']
-        search_result_id = row['id']
-        
-        if link and link != 'nan':
-            progress = (index + 1) / total_links
-            if progress_callback:
-                progress_callback(progress)
-            if status_callback:
-                status_callback(f"Processing link {index + 1}/{total_links}: {link[:50]}...")
+    try:
+        # Plain (id, link) tuples from SQL; no DataFrame rows are built at all
+        for position, (search_result_id, link) in enumerate(_iter_unscraped_links(user_id), 1):
+            if _should_report(position, total_links):
+                if progress_callback:
+                    progress_callback(position / total_links)
+                if status_callback:
+                    status_callback(f"Processing link {position}/{total_links}: {link[:50]}...")
             
-            print(f"\nProcessing link {index + 1}/{total_links}: {link}")
+            if VERBOSE:
+                print(f"\nProcessing link {position}/{total_links}: {link}")
             
-            result = scrape_single_link_with_retry(link, search_result_id)
-            db_manager.insert_scraped_contact(search_result_id, result['contact_data'])
+            result = scrape_single_link_with_retry(link, search_result_id, force_rescrape=force_rescrape)
+            _queue_contact(pending_contacts, search_result_id, result['contact_data'])
             
             if result['success']:
                 successful_extractions += 1
-                contact_details = result['contact_details']
-                print(f"  ✓ Extracted:")
-                print(f"    Names: {contact_details['scraped_names']}")
-                print(f"    Phones: {contact_details['scraped_phones']}")
-                print(f"    Emails: {contact_details['scraped_emails']}")
+                if VERBOSE:
+                    contact_details = result['contact_details']
+                    print(f"  ✓ Extracted:\n"
+                          f"    Names: {contact_details['scraped_names']}\n"
+                          f"    Phones: {contact_details['scraped_phones']}\n"
+                          f"    Emails: {contact_details['scraped_emails']}")
+    finally:
+        # Flush the last partial batch, including whatever finished before an error
+        db_manager.insert_scraped_contacts_bulk(pending_contacts)
     
     return successful_extractions
 
 def get_results_for_download(user_id: int = None):
     """Get all results formatted for Excel download"""
-    results_df = db_manager.get_all_search_results(user_id)
+    # The SELECT already returns preferred columns first, then everything else
+    results_df = db_manager.get_search_results_for_download(DOWNLOAD_COLUMN_ORDER, user_id)
     
-    # Reorder columns for better readability
-    column_order = ['original_query', 'original_location', 'title', 'link', 
-                    'scraped_names', 'scraped_phones', 'scraped_emails', 'scraping_status',
-                    'snippet', 'source', 'address_text', 'phone_number_serper',
-                    'rating', 'reviews_count', 'attributes', 'raw_response', 'scraped_at']
-
-    # Only include columns that exist in the dataframe
-    existing_columns = [col for col in column_order if col in results_df.columns]
-    remaining_columns = [col for col in results_df.columns if col not in existing_columns]
-    final_columns = existing_columns + remaining_columns
-    results_df = results_df[final_columns]
+    # A handful of distinct values repeated on every row
+    for column in DOWNLOAD_CATEGORY_COLUMNS:
+        if column in results_df.columns:
+            results_df[column] = results_df[column].astype('category')
     
     return results_df
 
+def save_results_to_excel(results_df, output_file: str):
+    """Save scraped results to an Excel file"""
+    dataframe_to_xlsx(results_df, output_file, sheet_name='Results')
+
 if __name__ == "__main__":
     print("🚀 Starting Enhanced AI Scraper")
     print(f"Configuration:")
@@ -330,7 +851,7 @@ if __name__ == "__main__":
     
     if not results_df.empty:
         output_file = "Enhanced_AI_Scrape_Results.xlsx"
-        results_df.to_excel(output_file, index=False)
+        save_results_to_excel(results_df, output_file)
         print(f"\n✓ Results saved to {output_file}")
         
         # Show summary
@@ -1,121 +1,633 @@
 """
 Simple AI Scraper - Lightweight fallback for deployment environments
-Uses only basic requests and OpenAI API without heavy dependencies
+Uses only aiohttp and the OpenRouter API without heavy dependencies
 """
 import json
 import os
-import time
-import requests
-from typing import Dict, List, Optional, Callable
+import re
+import random
+import asyncio
+import hashlib
+import aiohttp
+from functools import partial
+from typing import Dict, List, Optional, Callable, Tuple
+from urllib.parse import unquote, urlsplit, urlunsplit
 from dotenv import load_dotenv
 from ..utils.database import db_manager
+from ..utils.rate_limiter import HostRateLimiter, CircuitBreaker
+
+# orjson is optional; fall back to the standard library json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# selectolax (Lexbor backend) is optional; without it markup is stripped with regular expressions
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# json5 is optional; it reads LLM replies with single quotes, comments or trailing commas
+try:
+    import json5
+    JSON5_AVAILABLE = True
+except ImportError:
+    JSON5_AVAILABLE = False
+
+# Optional on-disk cache of LLM extractions; without it every page costs an LLM call
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+def _json_dumps(value) -> str:
+    """Compact UTF-8 JSON text for raw_response columns"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+    return json.dumps(value, ensure_ascii=False, default=str)
 
 load_dotenv()
 
-def simple_scrape_website(url: str) -> str:
-    """Simple website content extraction using requests"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+# Configuration
+MAX_CONCURRENT_SCRAPES = int(os.getenv("MAX_CONCURRENT_SCRAPES", "3"))
+SCRAPE_DELAY_SECONDS = float(os.getenv("SCRAPE_DELAY_SECONDS", "0.5"))
+
+# Spaces requests to the same host; different hosts are fetched in parallel
+scrape_rate_limiter = HostRateLimiter(SCRAPE_DELAY_SECONDS)
+
+# One pooled session per run; connections are kept alive and reused across links
+FETCH_TIMEOUT_SECONDS = 10
+LLM_TIMEOUT_SECONDS = 30
+FETCH_CONNECTIONS_PER_HOST = 5
+FETCH_KEEPALIVE_SECONDS = 30
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+LLM_MODEL = "openai/gpt-3.5-turbo"
+LLM_MAX_TOKENS = 1000
+
+# Only HTML/text bodies are read, and only up to this many bytes; the LLM sees 5000 chars anyway
+FETCH_MAX_BYTES = 256 * 1024
+FETCH_CHUNK_BYTES = 32 * 1024
+
+# Links to documents and media are never fetched, and pages declaring more than
+# FETCH_MAX_PAGE_BYTES are skipped since contact details rarely lead such pages
+SKIPPED_URL_SUFFIXES = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico', '.tif', '.tiff',
+                        '.mp3', '.wav', '.mp4', '.mov', '.avi', '.webm', '.zip', '.rar', '.gz',
+                        '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')
+FETCH_MAX_PAGE_BYTES = 2_000_000
+
+# Pages whose text holds both an email and a tel: link are answered without the LLM
+# (names are then left empty); 0 always calls the LLM
+REGEX_PREFILTER = os.getenv("SCRAPE_REGEX_PREFILTER", "1").lower() in ("1", "true", "yes")
+
+# Pages are sent to the LLM this many per request, once a batch is full or its first page
+# has waited LLM_BATCH_WAIT_SECONDS; 1 sends every page on its own
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "5"))
+LLM_BATCH_WAIT_SECONDS = 2.0
+LLM_MAX_BATCH_TOKENS = 4096
+
+# Directory and lifetime for cached extractions (same model, URL and page content);
+# shared with the enhanced scraper's cache, under their own keys
+LLM_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", ".scrape_cache")
+LLM_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", str(7 * 86400)))
+
+# Scraped contacts are written in one transaction per this many links, or once the
+# oldest unwritten row has waited this many seconds for the batch to fill
+CONTACT_INSERT_BATCH_SIZE = 25
+CONTACT_FLUSH_SECONDS = 2.0
+
+# Links are read from the database in pages of this size
+LINK_PAGE_SIZE = 1000
+
+# Retries for rate-limited (429), failing (5xx) or dropped LLM calls, with exponential backoff + jitter
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRYABLE_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+# After this many LLM calls in a row fail even with retries, further calls fail fast
+# until one trial call per CIRCUIT_RESET_SECONDS gets through
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 60.0
+openrouter_circuit = CircuitBreaker("OpenRouter", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+
+async def _post_with_backoff(session: aiohttp.ClientSession, url: str, read: Callable = None,
+                             circuit: Optional[CircuitBreaker] = None, **kwargs) -> Tuple[int, object]:
+    """
+    POST and return (status, body), retrying only on 429/5xx responses or dropped connections;
+    successful calls never sleep
+    
+    read, when given, is awaited with a 200 response to produce the body instead of reading it whole.
+    circuit, when given, raises CircuitOpenError instead of posting while it is open, and is told
+    whether the call succeeded once retries are done.
+    """
+    if circuit is not None:
+        circuit.check()
+    
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with session.post(url, **kwargs) as response:
+                status = response.status
+                body = await (read(response) if read is not None and status == 200 else response.read())
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_RETRIES:
+                if circuit is not None:
+                    circuit.record_failure()
+                raise
+            reason = type(e).__name__
+        else:
+            if status not in RETRYABLE_STATUS_CODES:
+                if circuit is not None:
+                    circuit.record_success()
+                return status, body
+            if attempt == MAX_RETRIES:
+                if circuit is not None:
+                    circuit.record_failure()
+                return status, body
+            reason = status
+        
+        delay = min(RETRY_BASE_DELAY * 2 ** attempt + random.uniform(0, RETRY_BASE_DELAY), RETRY_MAX_DELAY)
+        print(f"  API returned {reason}, retrying in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+# Fixed instructions go in the system message, byte-identical on every call so providers
+# can reuse their prompt-prefix cache; only the page itself varies, in the user message
+CONTACT_EXTRACTION_PROMPT = """
+        Extract contact information from the website content the user sends.
+        Look for names, phone numbers, and email addresses.
+        
+        Return the information in this exact JSON format:
+        {
+            "names": ["name1", "name2"],
+            "phone_numbers": ["phone1", "phone2"],
+            "email_addresses": ["email1", "email2"]
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
         
-        # Extract text content (simple approach)
-        content = response.text
+        If no information is found for a category, return an empty list.
+        Only include actual contact information, not examples or placeholders.
+        """
+PAGE_MESSAGE = "Website URL: {url}\nContent: {content}"
+
+# Instructions for several pages in one call; the user message joins one PAGE_BLOCK per page
+BATCH_CONTACT_EXTRACTION_PROMPT = """
+        Extract contact information from each of the websites the user sends.
+        Look for names, phone numbers, and email addresses.
+        Each website starts with a line "=== <index> <url>".
         
-        # Basic cleanup - remove scripts and styles
-        import re
-        content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.DOTALL | re.IGNORECASE)
-        content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL | re.IGNORECASE)
-        content = re.sub(r'<[^>]+>', ' ', content)  # Remove HTML tags
-        content = re.sub(r'\s+', ' ', content)  # Normalize whitespace
+        Return a JSON array with one entry per website, in this exact format:
+        [
+            {
+                "index": 0,
+                "names": ["name1", "name2"],
+                "phone_numbers": ["phone1", "phone2"],
+                "email_addresses": ["email1", "email2"]
+            }
+        ]
         
-        return content[:5000]  # Limit content length
+        If no information is found for a category, return an empty list.
+        Only include actual contact information, not examples or placeholders.
+        """
+PAGE_BLOCK = "=== {index} {url}\n{content}"
+
+# Opened lazily so importing this module never touches the disk
+_llm_cache = None
+
+def _get_llm_cache():
+    """Return the shared on-disk extraction cache, or None when diskcache is not installed"""
+    global _llm_cache
+    if DISKCACHE_AVAILABLE and _llm_cache is None:
+        _llm_cache = diskcache.Cache(LLM_CACHE_PATH)
+    return _llm_cache
+
+def _llm_cache_key(url: str, content: str) -> str:
+    """Cache key covering the model, the instructions and the page message"""
+    message = PAGE_MESSAGE.format(url=url, content=content)
+    return "simple:" + hashlib.blake2b(
+        f"{LLM_MODEL}\0{CONTACT_EXTRACTION_PROMPT}\0{message}".encode(), digest_size=16
+    ).hexdigest()
+
+def _get_cached_extraction(url: str, content: str) -> Optional[Dict]:
+    """Extraction stored for this exact page, by a single or a batched call"""
+    cache = _get_llm_cache()
+    return cache.get(_llm_cache_key(url, content)) if cache is not None else None
+
+def _cache_extraction(url: str, content: str, extracted: Dict):
+    """Store an answered extraction; failures are not stored so the next pass retries them"""
+    cache = _get_llm_cache()
+    if cache is not None:
+        cache.set(_llm_cache_key(url, content), extracted, expire=LLM_CACHE_TTL)
+
+# Characters that open the JSON value each reply is asked for: a single page's
+# object, or a batch's array of objects
+OBJECT_OPENERS = "{"
+ARRAY_OPENERS = "["
+
+class _JsonEndScanner:
+    """Tracks streamed text until a JSON value opened by one of openers is balanced"""
+    
+    def __init__(self, openers: str, offset: int = 0):
+        self.openers = openers
+        self.position = offset
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> int:
+        """Consume text; the offset just past the value's end once it is balanced, else -1"""
+        for ch in text:
+            self.position += 1
+            if self.start < 0:
+                # Brackets of other kinds and quotes in leading prose are ignored
+                if ch in self.openers:
+                    self.start = self.position - 1
+                    self.depth = 1
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.position
+        return -1
+
+def _loads_reply_json(candidate: str):
+    """Decode one candidate JSON slice, falling back to json5 for sloppy replies"""
+    try:
+        return _json_loads(candidate)
+    except ValueError:
+        if not JSON5_AVAILABLE:
+            raise
+        return json5.loads(candidate)
+
+async def _read_reply(response: aiohttp.ClientResponse, openers: str = OBJECT_OPENERS) -> str:
+    """
+    Assistant text of a chat completion, read from its SSE stream
+    
+    Reading stops as soon as the reply holds a complete, decodable JSON value
+    opened by one of openers, so trailing prose is never waited for. Providers
+    that ignore "stream" answer with a plain JSON body, which is read whole.
+    """
+    if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+        return _json_loads(await response.read())["choices"][0]["message"]["content"]
+    
+    parts = []
+    scanner = _JsonEndScanner(openers)
+    async for line in response.content:
+        line = line.strip()
+        # Blank separators and ": keep-alive" comments carry no data
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+        choices = _json_loads(data).get("choices") or [{}]
+        delta = (choices[0].get("delta") or {}).get("content") or ""
+        parts.append(delta)
+        end = scanner.feed(delta)
+        while end >= 0:
+            text = "".join(parts)
+            try:
+                _loads_reply_json(text[scanner.start:end])
+                return text[:end]
+            except ValueError:
+                # Brackets in prose, e.g. "Contacts [found]:"; rescan from the next opener
+                retry_from = scanner.start + 1
+                scanner = _JsonEndScanner(openers, retry_from)
+                end = scanner.feed(text[retry_from:])
+    return "".join(parts)
+
+def _parse_json_reply(reply: str, openers: str = OBJECT_OPENERS):
+    """
+    First decodable JSON value opened by one of openers in an LLM reply,
+    ignoring code fences and surrounding prose
+    
+    A balanced slice that does not decode (brackets in prose) is skipped in
+    favour of the next candidate start.
+    """
+    error = ValueError("No JSON in LLM reply")
+    scanner = _JsonEndScanner(openers)
+    end = scanner.feed(reply)
+    while scanner.start >= 0:
+        try:
+            return _loads_reply_json(reply[scanner.start:end] if end >= 0 else reply[scanner.start:])
+        except ValueError as e:
+            error = e
+        retry_from = scanner.start + 1
+        scanner = _JsonEndScanner(openers, retry_from)
+        end = scanner.feed(reply[retry_from:])
+    raise error
+
+async def _chat_completion(session: aiohttp.ClientSession, api_key: str, instructions: str, message: str,
+                           max_tokens: int = LLM_MAX_TOKENS, openers: str = OBJECT_OPENERS) -> Tuple[int, str]:
+    """
+    POST fixed instructions plus one user message to OpenRouter and return (status, assistant text), streamed
+    
+    openers are the characters that may start the JSON value the reply is read up to.
+    """
+    status, body = await _post_with_backoff(
+        session,
+        OPENROUTER_URL,
+        read=partial(_read_reply, openers=openers),
+        circuit=openrouter_circuit,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": LLM_MODEL,
+            "messages": [
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": message}
+            ],
+            "temperature": 0.1,
+            "max_tokens": max_tokens,
+            "stream": True
+        },
+        timeout=aiohttp.ClientTimeout(total=LLM_TIMEOUT_SECONDS)
+    )
+    return status, body if status == 200 else ""
+
+async def simple_scrape_website(session: aiohttp.ClientSession, url: str) -> str:
+    """Simple website content extraction over the shared session"""
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT_SECONDS)) as response:
+            response.raise_for_status()
+            
+            # PDFs, images and other downloads are rejected before their body is read
+            content_type = response.headers.get('Content-Type', '').lower()
+            if content_type and 'html' not in content_type and not content_type.startswith('text/'):
+                return f"Error fetching content: unsupported content type {content_type.split(';')[0]}"
+            if (response.content_length or 0) > FETCH_MAX_PAGE_BYTES:
+                return f"Error fetching content: page too large ({response.content_length} bytes)"
+            
+            # Extract text content (simple approach), reading no more than FETCH_MAX_BYTES
+            chunks = []
+            received = 0
+            async for chunk in response.content.iter_chunked(FETCH_CHUNK_BYTES):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= FETCH_MAX_BYTES:
+                    break
+            body = b"".join(chunks)[:FETCH_MAX_BYTES]
+            try:
+                content = body.decode(response.charset or 'utf-8', errors='replace')
+            except LookupError:
+                # Unknown charset label in the Content-Type header
+                content = body.decode('utf-8', errors='replace')
+        
+        # mailto:/tel: targets vanish with the markup, so they lead the text
+        links = " ".join(dict.fromkeys(CONTACT_HREF_RE.findall(content)))
+        text = _html_to_text(content)
+        if links:
+            text = f"{CONTACT_LINKS_PREFIX}{links}\n{text}"
+        return text[:5000]  # Limit content length
         
     except Exception as e:
         return f"Error fetching content: {str(e)}"
 
-def extract_with_openai(content: str, url: str) -> Dict:
+# Contact patterns, compiled once
+CONTACT_HREF_RE = re.compile(r'href=["\']((?:mailto|tel):[^"\'\s]+)["\']', re.IGNORECASE)
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+CONTACT_LINKS_PREFIX = "Contact links: "
+
+# Markup stripping used when selectolax is not installed
+SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Asset names like logo@2x.png look like emails to EMAIL_RE
+ASSET_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.css', '.js')
+
+def fast_extract(content: str) -> Optional[Dict]:
+    """
+    Emails and phone numbers read straight from scraped page text
+    
+    Returns a result shaped like the LLM's when the page has at least one email
+    and one tel: link, or None when the LLM is still needed.
+    """
+    emails = {}
+    phones = {}
+    if content.startswith(CONTACT_LINKS_PREFIX):
+        for href in content[len(CONTACT_LINKS_PREFIX):content.find("\n")].split():
+            scheme, _, value = href.partition(":")
+            value = unquote(value).strip()
+            if scheme.lower() == "tel" and sum(ch.isdigit() for ch in value) >= 7:
+                phones[value] = None
+            elif scheme.lower() == "mailto" and "@" in value:
+                emails[value.split("?")[0].lower()] = None
+    for match in EMAIL_RE.findall(content):
+        if not match.lower().endswith(ASSET_SUFFIXES):
+            emails[match.lower()] = None
+    
+    if not (emails and phones):
+        return None
+    return {
+        "names": [],
+        "phone_numbers": list(phones),
+        "email_addresses": list(emails),
+        "extracted_by": "regex"
+    }
+
+def _html_to_text(html: str) -> str:
+    """Visible text of a page with scripts and styles dropped and whitespace collapsed"""
+    if SELECTOLAX_AVAILABLE:
+        tree = HTMLParser(html)
+        tree.strip_tags(['script', 'style', 'noscript'])
+        # The whole document, so the <title> (often the business name) is kept as before
+        return " ".join(tree.root.text(separator=' ').split()) if tree.root is not None else ""
+    
+    # Basic cleanup - remove scripts and styles
+    content = SCRIPT_RE.sub('', html)
+    content = STYLE_RE.sub('', content)
+    content = TAG_RE.sub(' ', content)  # Remove HTML tags
+    return WHITESPACE_RE.sub(' ', content).strip()  # Normalize whitespace
+
+async def extract_with_openai(session: aiohttp.ClientSession, content: str, url: str) -> Dict:
     """Extract contact information using OpenAI API"""
     try:
         openai_key = os.getenv("OPENROUTER_API_KEY")
         if not openai_key:
             return {"error": "OpenAI API key not configured"}
         
-        # Prepare the prompt
-        prompt = f"""
-        Extract contact information from the following website content. 
-        Look for names, phone numbers, and email addresses.
-        
-        Website URL: {url}
-        Content: {content}
-        
-        Return the information in this exact JSON format:
-        {{
-            "names": ["name1", "name2"],
-            "phone_numbers": ["phone1", "phone2"],
-            "email_addresses": ["email1", "email2"]
-        }}
+        # The same page seen again (re-runs, aliased links) is answered without an LLM call
+        cached = _get_cached_extraction(url, content)
+        if cached is not None:
+            return cached
         
-        If no information is found for a category, return an empty list.
-        Only include actual contact information, not examples or placeholders.
-        """
+        # Prepare the prompt
+        message = PAGE_MESSAGE.format(url=url, content=content)
         
         # Call OpenAI API
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {openai_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "openai/gpt-3.5-turbo",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.1,
-                "max_tokens": 1000
-            },
-            timeout=30
-        )
+        status, reply = await _chat_completion(session, openai_key, CONTACT_EXTRACTION_PROMPT, message)
         
-        if response.status_code == 200:
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Try to parse JSON
+        if status == 200:
             try:
-                # Remove markdown formatting if present
-                if content.startswith("```json"):
-                    content = content.replace("```json", "").replace("```", "").strip()
-                
-                return json.loads(content)
-            except:
-                # Fallback: try to extract using regex
-                import re
-                names = re.findall(r'"names":\s*\[(.*?)\]', content)
-                phones = re.findall(r'"phone_numbers":\s*\[(.*?)\]', content)
-                emails = re.findall(r'"email_addresses":\s*\[(.*?)\]', content)
-                
-                return {
-                    "names": [n.strip('"') for n in names[0].split(',')] if names else [],
-                    "phone_numbers": [p.strip('"') for p in phones[0].split(',')] if phones else [],
-                    "email_addresses": [e.strip('"') for e in emails[0].split(',')] if emails else []
-                }
+                extracted = _parse_json_reply(reply)
+            except ValueError as e:
+                return {"error": f"Unreadable reply: {str(e)}"}
+            if not isinstance(extracted, dict):
+                return {"error": "Unreadable reply: not a JSON object"}
+            
+            _cache_extraction(url, content, extracted)
+            return extracted
         else:
-            return {"error": f"API call failed: {response.status_code}"}
+            return {"error": f"API call failed: {status}"}
             
     except Exception as e:
         return {"error": f"Extraction failed: {str(e)}"}
 
-def process_single_link_simple(link: str, search_result_id: int) -> Dict:
-    """Process a single link using simple scraping"""
+async def extract_batch_with_openai(session: aiohttp.ClientSession, pages: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+    """
+    Extract contacts for several (url, content) pages with one LLM call
+    
+    Returns one entry per page, in order. An entry is None when the reply
+    left that page out or could not be parsed, so the caller can retry it alone.
+    """
     try:
-        print(f"  Simple scraping: {link[:50]}...")
+        openai_key = os.getenv("OPENROUTER_API_KEY")
+        if not openai_key:
+            return [{"error": "OpenAI API key not configured"}] * len(pages)
         
-        # Get website content
-        content = simple_scrape_website(link)
+        message = "\n\n".join(
+            PAGE_BLOCK.format(index=index, url=url, content=content) for index, (url, content) in enumerate(pages)
+        )
+        max_tokens = min(LLM_MAX_TOKENS * len(pages), LLM_MAX_BATCH_TOKENS)
+        status, content = await _chat_completion(session, openai_key, BATCH_CONTACT_EXTRACTION_PROMPT, message,
+                                                 max_tokens, ARRAY_OPENERS)
+        if status != 200:
+            return [{"error": f"API call failed: {status}"}] * len(pages)
+        
+        entries = _parse_json_reply(content, ARRAY_OPENERS)
+    except Exception:
+        return [None] * len(pages)
+    
+    results = [None] * len(pages)
+    for entry in entries if isinstance(entries, list) else ():
+        index = entry.get("index") if isinstance(entry, dict) else None
+        if isinstance(index, int) and 0 <= index < len(pages) and results[index] is None:
+            extracted = {key: entry.get(key) or [] for key in ("names", "phone_numbers", "email_addresses")}
+            _cache_extraction(*pages[index], extracted)
+            results[index] = extracted
+    return results
+
+class _ExtractionBatcher:
+    """
+    Groups pages into extract_batch_with_openai calls for one run
+    
+    A batch is sent once it holds batch_size pages or its first page has waited
+    LLM_BATCH_WAIT_SECONDS, with at most max_in_flight LLM calls at a time.
+    """
+    
+    def __init__(self, session: aiohttp.ClientSession, batch_size: int = LLM_BATCH_SIZE,
+                 max_in_flight: int = MAX_CONCURRENT_SCRAPES):
+        self.session = session
+        self.batch_size = max(1, batch_size)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._calls = set()
+        self._collector = asyncio.create_task(self._collect())
+    
+    async def extract(self, url: str, content: str) -> Dict:
+        """Contacts for one page, answered from the cache or by the next batch"""
+        cached = _get_cached_extraction(url, content)
+        if cached is not None:
+            return cached
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((url, content, future))
+        return await future
+    
+    async def _collect(self):
+        """Form batches from queued pages and send each once an LLM slot is free"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + LLM_BATCH_WAIT_SECONDS
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Pages keep queueing while every slot is busy, so the next batch leaves full
+            await self._slots.acquire()
+            call = asyncio.create_task(self._send(batch))
+            self._calls.add(call)
+            call.add_done_callback(self._calls.discard)
+    
+    async def _send(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        """Run one LLM call for batch and resolve each page's future"""
+        try:
+            if len(batch) == 1:
+                url, content, _ = batch[0]
+                results = [await extract_with_openai(self.session, content, url)]
+            else:
+                results = await extract_batch_with_openai(self.session, [(url, content) for url, content, _ in batch])
+                # Pages the batched reply left out are asked about on their own
+                missing = [index for index, result in enumerate(results) if result is None]
+                retried = await asyncio.gather(*(extract_with_openai(self.session, batch[index][1], batch[index][0])
+                                                 for index in missing))
+                for index, result in zip(missing, retried):
+                    results[index] = result
+        except Exception as e:
+            results = [{"error": f"Extraction failed: {str(e)}"}] * len(batch)
+        finally:
+            self._slots.release()
+        
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def close(self):
+        """Stop collecting and cancel LLM calls still in flight"""
+        self._collector.cancel()
+        for call in list(self._calls):
+            call.cancel()
+
+def _join_unique(values) -> Optional[str]:
+    """Join values with '; ', dropping repeats but keeping first-seen order"""
+    if not values:
+        return None
+    if not isinstance(values, list):
+        values = [values]
+    return "; ".join(dict.fromkeys(str(value) for value in values if value)) or None
+
+async def process_single_link_simple(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                     batcher: _ExtractionBatcher, link: str, search_result_id: int) -> Dict:
+    """Process a single link: fetch once a concurrency slot is free, then extract in the next LLM batch"""
+    try:
+        if urlsplit(link).path.lower().endswith(SKIPPED_URL_SUFFIXES):
+            content = "Error fetching content: not a web page"
+        else:
+            # The slot only covers the fetch, so fetched pages can pile up into full batches
+            async with semaphore:
+                await asyncio.sleep(scrape_rate_limiter.reserve(link))
+                print(f"  Simple scraping: {link[:50]}...")
+                
+                # Get website content
+                content = await simple_scrape_website(session, link)
         
         if content.startswith("Error"):
             return {
@@ -129,8 +641,10 @@ def process_single_link_simple(link: str, search_result_id: int) -> Dict:
                 }
             }
         
-        # Extract contact info with AI
-        extracted_data = extract_with_openai(content, link)
+        # Extract contact info with AI, unless plain patterns already found it
+        extracted_data = fast_extract(content) if REGEX_PREFILTER else None
+        if extracted_data is None:
+            extracted_data = await batcher.extract(link, content)
         
         if "error" in extracted_data:
             return {
@@ -145,9 +659,9 @@ def process_single_link_simple(link: str, search_result_id: int) -> Dict:
             }
         
         # Format results
-        names = "; ".join(extracted_data.get("names", [])) if extracted_data.get("names") else None
-        phones = "; ".join(extracted_data.get("phone_numbers", [])) if extracted_data.get("phone_numbers") else None
-        emails = "; ".join(extracted_data.get("email_addresses", [])) if extracted_data.get("email_addresses") else None
+        names = _join_unique(extracted_data.get("names"))
+        phones = _join_unique(extracted_data.get("phone_numbers"))
+        emails = _join_unique(extracted_data.get("email_addresses"))
         
         return {
             'success': True,
@@ -156,7 +670,7 @@ def process_single_link_simple(link: str, search_result_id: int) -> Dict:
                 'scraped_phones': phones,
                 'scraped_emails': emails,
                 'scraping_status': 'Success (Simple)',
-                'raw_response': json.dumps(extracted_data)
+                'raw_response': _json_dumps(extracted_data)
             }
         }
         
@@ -175,50 +689,100 @@ def process_single_link_simple(link: str, search_result_id: int) -> Dict:
 def process_links_from_database(progress_callback=None, status_callback=None, user_id: int = None):
     """Simple version of link processing for deployment environments"""
     
-    # Get unscraped links from database
-    data = db_manager.get_unscraped_links(user_id)
+    # Search results often repeat a page (chains, tracking params), so each page is
+    # fetched and extracted once and its contacts written to every matching row
+    links_to_process: Dict[str, Tuple[str, List[int]]] = {}
+    total_links = 0
+    for search_result_id, link in _iter_unscraped_links(user_id):
+        links_to_process.setdefault(_canonical_url(link), (link, []))[1].append(search_result_id)
+        total_links += 1
     
-    if data.empty:
+    if not total_links:
         print("No unscraped links found in database")
         return 0
     
-    print(f"Found {len(data)} unscraped links in database")
-    print("Using simple scraper (deployment mode)")
+    print(f"Found {total_links} unscraped links in database ({len(links_to_process)} distinct pages)")
+    print(f"Using simple scraper (deployment mode) with {MAX_CONCURRENT_SCRAPES} concurrent workers")
     
-    total_links = len(data)
+    successful_extractions = asyncio.run(
+        _process_links_async(list(links_to_process.values()), total_links, progress_callback, status_callback)
+    )
+    
+    print(f"Simple scraping completed: {successful_extractions}/{total_links} successful")
+    return successful_extractions
+
+def _canonical_url(url: str) -> str:
+    """Key for links that load the same page: lowercase scheme and host, no trailing slash, utm_* or fragment"""
+    parts = urlsplit(url.strip())
+    query = "&".join(pair for pair in parts.query.split("&") if pair and not pair.lower().startswith("utm_"))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", query, ""))
+
+def _iter_unscraped_links(user_id: Optional[int]):
+    """Yield (id, link) pairs with a usable link, one database page at a time"""
+    after_id = 0
+    while True:
+        page = db_manager.get_unscraped_link_page(user_id, after_id, LINK_PAGE_SIZE)
+        if not page:
+            return
+        yield from page
+        after_id = page[-1][0]
+
+async def _process_links_async(links_to_process: List[Tuple[str, List[int]]], total_links: int,
+                               progress_callback=None, status_callback=None) -> int:
+    """Scrape every link with up to MAX_CONCURRENT_SCRAPES fetches and LLM calls in flight"""
     successful_extractions = 0
+    processed = 0
+    pending_contacts = []
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_SCRAPES * 2, limit_per_host=FETCH_CONNECTIONS_PER_HOST,
+                                     keepalive_timeout=FETCH_KEEPALIVE_SECONDS)
     
-    for index, (_, row) in enumerate(data.iterrows()):
-        link = row['link']
-        search_result_id = row['id']
-        
-        if not link or link == 'nan':
-            continue
+    async with aiohttp.ClientSession(connector=connector, headers=FETCH_HEADERS) as session:
+        batcher = _ExtractionBatcher(session)
         
-        # Update progress
-        progress = (index + 1) / total_links
-        if progress_callback:
-            progress_callback(progress)
+        async def scrape(link: str, search_result_ids: List[int]):
+            return link, search_result_ids, await process_single_link_simple(session, semaphore, batcher, link,
+                                                                             search_result_ids[0])
         
-        if status_callback:
-            status_callback(f"Processing {index + 1}/{total_links}: {link[:50]}...")
-        
-        # Process the link
-        result = process_single_link_simple(link, search_result_id)
-        
-        # Update database
-        if result['success']:
-            successful_extractions += 1
-            
-        db_manager.update_scraping_result(
-            search_result_id=search_result_id,
-            **result['contact_data']
-        )
-        
-        # Small delay
-        time.sleep(0.5)
+        tasks = [asyncio.create_task(scrape(link, search_ids)) for link, search_ids in links_to_process]
+        running = set(tasks)
+        try:
+            while running:
+                # Waits at most CONTACT_FLUSH_SECONDS while rows are unwritten, so slow links never hold them back
+                done, running = await asyncio.wait(running, timeout=CONTACT_FLUSH_SECONDS if pending_contacts else None,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    db_manager.insert_scraped_contacts_bulk(pending_contacts)
+                    pending_contacts.clear()
+                    continue
+                
+                for task in done:
+                    link, search_result_ids, result = task.result()
+                    processed += len(search_result_ids)
+                    
+                    # Update progress
+                    if progress_callback:
+                        progress_callback(processed / total_links)
+                    
+                    if status_callback:
+                        status_callback(f"Processing {processed}/{total_links}: {link[:50]}...")
+                    
+                    # Update database (writes stay on the event loop, one at a time)
+                    if result['success']:
+                        successful_extractions += len(search_result_ids)
+                    
+                    pending_contacts.extend((search_result_id, result['contact_data'])
+                                            for search_result_id in search_result_ids)
+                    if len(pending_contacts) >= CONTACT_INSERT_BATCH_SIZE:
+                        db_manager.insert_scraped_contacts_bulk(pending_contacts)
+                        pending_contacts.clear()
+        finally:
+            for task in tasks:
+                task.cancel()
+            batcher.close()
+            # Flush the last partial batch, including whatever finished before an error
+            db_manager.insert_scraped_contacts_bulk(pending_contacts)
     
-    print(f"Simple scraping completed: {successful_extractions}/{total_links} successful")
     return successful_extractions
 
 def get_results_for_download(user_id: int = None):
@@ -1,8 +1,101 @@
 import streamlit as st
 import re
-from typing import Optional, Dict
+import string
+import time
+from typing import Optional, Dict, Tuple
 from .database import db_manager
 
+# Validation patterns, compiled once instead of on every form rerun
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+
+# Passwords need this many characters and at least one of each character class
+MIN_PASSWORD_LENGTH = 8
+
+# Maps each ASCII byte to its class mark (U, L or D) and everything else to 0, so one
+# bytes.translate pass shows every class a password contains
+CHAR_CLASS_TABLE = bytes(
+    ord('U') if char in string.ascii_uppercase else
+    ord('L') if char in string.ascii_lowercase else
+    ord('D') if char in string.digits else 0
+    for char in map(chr, range(256))
+)
+
+# Static form markup, built once at import rather than inline in the form functions
+FIELD_LABEL_HTML = """
+<div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
+    <span style="font-size: 1.2rem;">{icon}</span>
+    <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
+        {label}
+    </label>
+</div>
+"""
+LOGIN_USERNAME_LABEL_HTML = FIELD_LABEL_HTML.format(icon="👤", label="Username or Email Address")
+LOGIN_PASSWORD_LABEL_HTML = FIELD_LABEL_HTML.format(icon="🔐", label="Password")
+SIGNUP_USERNAME_LABEL_HTML = FIELD_LABEL_HTML.format(icon="👤", label="Choose Your Username")
+SIGNUP_EMAIL_LABEL_HTML = FIELD_LABEL_HTML.format(icon="📧", label="Email Address")
+SIGNUP_PASSWORD_LABEL_HTML = FIELD_LABEL_HTML.format(icon="🔐", label="Create Password")
+SIGNUP_CONFIRM_LABEL_HTML = FIELD_LABEL_HTML.format(icon="🔒", label="Confirm Password")
+
+LOGIN_TIP_HTML = """
+<div style="margin-top: 2rem; text-align: center; padding: 1.5rem; 
+            background: rgba(255, 255, 255, 0.03); border-radius: 16px; 
+            border: 1px solid rgba(255, 255, 255, 0.05);">
+    <div style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem;">
+        💡 <strong>Tip:</strong> You can use either your username or email address to sign in
+    </div>
+</div>
+"""
+
+SIGNUP_REQUIREMENTS_HTML = """
+<div style="margin-top: 2rem; padding: 1.5rem; 
+            background: rgba(255, 255, 255, 0.03); border-radius: 16px; 
+            border: 1px solid rgba(255, 255, 255, 0.05);">
+    <div style="text-align: center; margin-bottom: 1rem;">
+        <div style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
+            📋 Account Requirements
+        </div>
+    </div>
+    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem;">
+        <div style="background: rgba(255, 255, 255, 0.02); padding: 1rem; border-radius: 12px;">
+            <div style="color: rgba(255, 255, 255, 0.8); font-weight: 600; margin-bottom: 0.5rem;">
+                👤 Username Guidelines
+            </div>
+            <div style="color: rgba(255, 255, 255, 0.6); font-size: 0.9rem;">
+                • 3-30 characters<br>
+                • Letters, numbers, underscore only<br>
+                • Must be unique
+            </div>
+        </div>
+        <div style="background: rgba(255, 255, 255, 0.02); padding: 1rem; border-radius: 12px;">
+            <div style="color: rgba(255, 255, 255, 0.8); font-weight: 600; margin-bottom: 0.5rem;">
+                🔐 Password Security
+            </div>
+            <div style="color: rgba(255, 255, 255, 0.6); font-size: 0.9rem;">
+                • Minimum 8 characters<br>
+                • Uppercase & lowercase letters<br>
+                • At least one number
+            </div>
+        </div>
+    </div>
+</div>
+"""
+
+# A validated session token is trusted for this many seconds, so the several auth
+# checks in one script run (user id, username, sidebar) share one database lookup
+SESSION_CHECK_TTL_SECONDS = 5.0
+
+def _password_checks(password: str) -> Tuple[bool, bool, bool, bool]:
+    """(long enough, has uppercase, has lowercase, has digit), from one pass over the password"""
+    marks = password.encode('ascii', 'ignore').translate(CHAR_CLASS_TABLE)
+    return (
+        len(password) >= MIN_PASSWORD_LENGTH,
+        b'U' in marks,
+        b'L' in marks,
+        # Non-ASCII decimal digits count as numbers too, as they did for the \d pattern
+        b'D' in marks or (not password.isascii() and any(char.isdecimal() for char in password))
+    )
+
 class AuthManager:
     """Authentication manager for Streamlit app"""
     
@@ -18,20 +111,24 @@ class AuthManager:
     
     def validate_email(self, email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return EMAIL_RE.match(email) is not None
     
     def validate_password(self, password: str) -> Dict[str, str]:
         """Validate password strength"""
+        # Nothing typed yet (every first render of the form); no characters to scan
+        if not password:
+            return {"valid": False, "errors": [f"Password must be at least {MIN_PASSWORD_LENGTH} characters long"]}
+        
         errors = []
+        long_enough, has_upper, has_lower, has_digit = _password_checks(password)
         
-        if len(password) < 8:
-            errors.append("Password must be at least 8 characters long")
-        if not re.search(r'[A-Z]', password):
+        if not long_enough:
+            errors.append(f"Password must be at least {MIN_PASSWORD_LENGTH} characters long")
+        if not has_upper:
             errors.append("Password must contain at least one uppercase letter")
-        if not re.search(r'[a-z]', password):
+        if not has_lower:
             errors.append("Password must contain at least one lowercase letter")
-        if not re.search(r'\d', password):
+        if not has_digit:
             errors.append("Password must contain at least one number")
         
         return {"valid": len(errors) == 0, "errors": errors}
@@ -44,7 +141,10 @@ class AuthManager:
             errors.append("Username must be at least 3 characters long")
         if len(username) > 30:
             errors.append("Username must be less than 30 characters")
-        if not re.match(r'^[a-zA-Z0-9_]+$', username):
+        if errors:
+            # The length is already wrong; skip the character scan
+            return {"valid": False, "errors": errors}
+        if not USERNAME_RE.match(username):
             errors.append("Username can only contain letters, numbers, and underscores")
         
         return {"valid": len(errors) == 0, "errors": errors}
@@ -55,14 +155,7 @@ class AuthManager:
         with st.form("login_form", clear_on_submit=False):
             # Enhanced input fields with custom styling
             st.markdown('<div class="auth-input-group">', unsafe_allow_html=True)
-            st.markdown("""
-            <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                <span style="font-size: 1.2rem;">👤</span>
-                <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    Username or Email Address
-                </label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(LOGIN_USERNAME_LABEL_HTML, unsafe_allow_html=True)
             username = st.text_input(
                 "Username or Email", 
                 placeholder="Enter your username or email address",
@@ -72,14 +165,7 @@ class AuthManager:
             st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('<div class="auth-input-group">', unsafe_allow_html=True)
-            st.markdown("""
-            <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                <span style="font-size: 1.2rem;">🔐</span>
-                <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    Password
-                </label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(LOGIN_PASSWORD_LABEL_HTML, unsafe_allow_html=True)
             password = st.text_input(
                 "Password", 
                 type="password", 
@@ -129,7 +215,6 @@ class AuthManager:
                             """, unsafe_allow_html=True)
                             
                             # Small delay for better UX
-                            import time
                             time.sleep(1)
                             st.rerun()
                             return True
@@ -156,15 +241,7 @@ class AuthManager:
                     """, unsafe_allow_html=True)
         
         # Additional help section
-        st.markdown("""
-        <div style="margin-top: 2rem; text-align: center; padding: 1.5rem; 
-                    background: rgba(255, 255, 255, 0.03); border-radius: 16px; 
-                    border: 1px solid rgba(255, 255, 255, 0.05);">
-            <div style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem;">
-                💡 <strong>Tip:</strong> You can use either your username or email address to sign in
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(LOGIN_TIP_HTML, unsafe_allow_html=True)
         
         return False
     
@@ -174,14 +251,7 @@ class AuthManager:
         with st.form("signup_form", clear_on_submit=False):
             # Enhanced input fields with icons and styling
             st.markdown('<div class="auth-input-group">', unsafe_allow_html=True)
-            st.markdown("""
-            <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                <span style="font-size: 1.2rem;">👤</span>
-                <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    Choose Your Username
-                </label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(SIGNUP_USERNAME_LABEL_HTML, unsafe_allow_html=True)
             username = st.text_input(
                 "Username", 
                 placeholder="3-30 characters, letters, numbers, underscore",
@@ -191,14 +261,7 @@ class AuthManager:
             st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('<div class="auth-input-group">', unsafe_allow_html=True)
-            st.markdown("""
-            <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                <span style="font-size: 1.2rem;">📧</span>
-                <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    Email Address
-                </label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(SIGNUP_EMAIL_LABEL_HTML, unsafe_allow_html=True)
             email = st.text_input(
                 "Email", 
                 placeholder="your.email@example.com",
@@ -208,14 +271,7 @@ class AuthManager:
             st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('<div class="auth-input-group">', unsafe_allow_html=True)
-            st.markdown("""
-            <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                <span style="font-size: 1.2rem;">🔐</span>
-                <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    Create Password
-                </label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(SIGNUP_PASSWORD_LABEL_HTML, unsafe_allow_html=True)
             password = st.text_input(
                 "Password", 
                 type="password", 
@@ -226,19 +282,11 @@ class AuthManager:
             
             # Real-time password strength indicator
             if password:
-                strength_score = 0
+                # Same checks as validate_password, one point each
+                strength_score = sum(_password_checks(password))
                 strength_text = "Weak"
                 strength_class = "strength-weak"
                 
-                if len(password) >= 8:
-                    strength_score += 1
-                if re.search(r'[A-Z]', password):
-                    strength_score += 1
-                if re.search(r'[a-z]', password):
-                    strength_score += 1
-                if re.search(r'\d', password):
-                    strength_score += 1
-                
                 if strength_score >= 4:
                     strength_text = "Strong"
                     strength_class = "strength-strong"
@@ -261,14 +309,7 @@ class AuthManager:
             st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('<div class="auth-input-group">', unsafe_allow_html=True)
-            st.markdown("""
-            <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                <span style="font-size: 1.2rem;">🔒</span>
-                <label style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    Confirm Password
-                </label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(SIGNUP_CONFIRM_LABEL_HTML, unsafe_allow_html=True)
             confirm_password = st.text_input(
                 "Confirm Password", 
                 type="password", 
@@ -344,24 +385,22 @@ class AuthManager:
                         </div>
                         """, unsafe_allow_html=True)
                         
-                        # Auto-login after signup
-                        auth_result = self.db.authenticate_user(username, password)
-                        if auth_result["success"]:
-                            session_token = self.db.create_session(auth_result["user_id"])
-                            
-                            st.session_state.authenticated = True
-                            st.session_state.user_info = {
-                                "user_id": auth_result["user_id"],
-                                "username": auth_result["username"],
-                                "email": auth_result["email"]
-                            }
-                            st.session_state.session_token = session_token
-                            
-                            # Small delay for better UX
-                            import time
-                            time.sleep(1.5)
-                            st.rerun()
-                            return True
+                        # Auto-login after signup; create_user already returned the account,
+                        # so the password is not hashed a second time
+                        session_token = self.db.create_session(result["user_id"])
+                        
+                        st.session_state.authenticated = True
+                        st.session_state.user_info = {
+                            "user_id": result["user_id"],
+                            "username": result["username"],
+                            "email": result["email"]
+                        }
+                        st.session_state.session_token = session_token
+                        
+                        # Small delay for better UX
+                        time.sleep(1.5)
+                        st.rerun()
+                        return True
                     else:
                         # Enhanced error message
                         st.markdown(f"""
@@ -375,39 +414,7 @@ class AuthManager:
                         """, unsafe_allow_html=True)
         
         # Enhanced requirements and help section
-        st.markdown("""
-        <div style="margin-top: 2rem; padding: 1.5rem; 
-                    background: rgba(255, 255, 255, 0.03); border-radius: 16px; 
-                    border: 1px solid rgba(255, 255, 255, 0.05);">
-            <div style="text-align: center; margin-bottom: 1rem;">
-                <div style="color: rgba(255, 255, 255, 0.9); font-weight: 600; font-size: 1rem;">
-                    📋 Account Requirements
-                </div>
-            </div>
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem;">
-                <div style="background: rgba(255, 255, 255, 0.02); padding: 1rem; border-radius: 12px;">
-                    <div style="color: rgba(255, 255, 255, 0.8); font-weight: 600; margin-bottom: 0.5rem;">
-                        👤 Username Guidelines
-                    </div>
-                    <div style="color: rgba(255, 255, 255, 0.6); font-size: 0.9rem;">
-                        • 3-30 characters<br>
-                        • Letters, numbers, underscore only<br>
-                        • Must be unique
-                    </div>
-                </div>
-                <div style="background: rgba(255, 255, 255, 0.02); padding: 1rem; border-radius: 12px;">
-                    <div style="color: rgba(255, 255, 255, 0.8); font-weight: 600; margin-bottom: 0.5rem;">
-                        🔐 Password Security
-                    </div>
-                    <div style="color: rgba(255, 255, 255, 0.6); font-size: 0.9rem;">
-                        • Minimum 8 characters<br>
-                        • Uppercase & lowercase letters<br>
-                        • At least one number
-                    </div>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(SIGNUP_REQUIREMENTS_HTML, unsafe_allow_html=True)
         
         return False
     
@@ -424,11 +431,19 @@ class AuthManager:
         if not st.session_state.authenticated or not st.session_state.session_token:
             return False
         
+        # Reuse a recent validation of the same token
+        session_token = st.session_state.session_token
+        last_check = st.session_state.get('session_checked')
+        if (last_check and last_check[0] == session_token and st.session_state.user_info
+                and time.monotonic() - last_check[1] < SESSION_CHECK_TTL_SECONDS):
+            return True
+        
         # Validate session token
-        user_info = self.db.validate_session(st.session_state.session_token)
+        user_info = self.db.validate_session(session_token)
         if user_info:
             # Update user info in session state
             st.session_state.user_info = user_info
+            st.session_state.session_checked = (session_token, time.monotonic())
             return True
         else:
             # Session expired or invalid
@@ -452,6 +467,7 @@ class AuthManager:
         st.session_state.authenticated = False
         st.session_state.user_info = None
         st.session_state.session_token = None
+        st.session_state.session_checked = None
         
         st.rerun()
     
@@ -5,7 +5,11 @@ import os
 import hashlib
 import secrets
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+# scraped_contacts columns joined onto search results, in output order
+SCRAPED_CONTACT_COLUMNS = ('scraped_names', 'scraped_phones', 'scraped_emails',
+                           'scraping_status', 'raw_response', 'scraped_at')
 
 class DatabaseManager:
     def __init__(self, db_path: str = "scraper_data.db"):
@@ -17,6 +21,10 @@ class DatabaseManager:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
+            # WAL persists in the file: readers no longer block the scrape writer and commits
+            # append to the log instead of rewriting pages
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             # Create users table for authentication
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -149,10 +157,11 @@ class DatabaseManager:
             password_hash = self._hash_password(password, salt)
             
             try:
+                # The new user is signed in straight away, so this counts as their first login
                 cursor.execute("""
-                    INSERT INTO users (username, email, password_hash, salt)
-                    VALUES (?, ?, ?, ?)
-                """, (username, email, password_hash, salt))
+                    INSERT INTO users (username, email, password_hash, salt, last_login)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (username, email, password_hash, salt, datetime.now()))
                 
                 user_id = cursor.lastrowid
                 conn.commit()
@@ -160,6 +169,8 @@ class DatabaseManager:
                 return {
                     "success": True, 
                     "user_id": user_id,
+                    "username": username,
+                    "email": email,
                     "message": "User created successfully"
                 }
             except Exception as e:
@@ -327,6 +338,48 @@ class DatabaseManager:
                 """
                 return pd.read_sql_query(query, conn)
     
+    def count_unscraped_links(self, user_id: int = None) -> int:
+        """Count usable links that haven't been scraped yet, matching get_unscraped_link_page"""
+        with sqlite3.connect(self.db_path) as conn:
+            if user_id:
+                row = conn.execute("""
+                    SELECT COUNT(*) FROM search_results
+                    WHERE scraped = FALSE AND (user_id = ? OR user_id IS NULL)
+                      AND link IS NOT NULL AND link != '' AND link != 'nan'
+                """, (user_id,)).fetchone()
+            else:
+                row = conn.execute("""
+                    SELECT COUNT(*) FROM search_results
+                    WHERE scraped = FALSE
+                      AND link IS NOT NULL AND link != '' AND link != 'nan'
+                """).fetchone()
+            return row[0]
+    
+    def get_unscraped_link_page(self, user_id: int = None, after_id: int = 0, limit: int = 1000) -> List[Tuple[int, str]]:
+        """
+        Get the next page of (id, link) pairs to scrape, ordered by id
+        
+        Pages are keyed on the last id seen rather than an OFFSET, so rows
+        marked as scraped while paging never shift later pages.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            if user_id:
+                return conn.execute("""
+                    SELECT id, link FROM search_results
+                    WHERE scraped = FALSE AND (user_id = ? OR user_id IS NULL)
+                      AND id > ? AND link IS NOT NULL AND link != '' AND link != 'nan'
+                    ORDER BY id
+                    LIMIT ?
+                """, (user_id, after_id, limit)).fetchall()
+            else:
+                return conn.execute("""
+                    SELECT id, link FROM search_results
+                    WHERE scraped = FALSE
+                      AND id > ? AND link IS NOT NULL AND link != '' AND link != 'nan'
+                    ORDER BY id
+                    LIMIT ?
+                """, (after_id, limit)).fetchall()
+    
     def get_all_search_results(self, user_id: int = None) -> pd.DataFrame:
         """Get all search results"""
         with sqlite3.connect(self.db_path) as conn:
@@ -350,6 +403,35 @@ class DatabaseManager:
                 """
                 return pd.read_sql_query(query, conn)
     
+    def get_search_results_for_download(self, leading_columns: Tuple[str, ...], user_id: int = None) -> pd.DataFrame:
+        """
+        Get all search results with leading_columns first, in that order, then every other column
+        
+        The order is built into the SELECT so the frame comes back already arranged.
+        Names not present in either table are skipped.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            # Column names come from the schema, never from the caller, so they are safe to interpolate
+            available = {row[1]: f"sr.{row[1]}" for row in conn.execute("PRAGMA table_info(search_results)")}
+            for column in SCRAPED_CONTACT_COLUMNS:
+                available[column] = f"sc.{column}"
+            
+            leading = [column for column in leading_columns if column in available]
+            leading_set = set(leading)
+            projection = [available[column] for column in leading]
+            projection += [source for column, source in available.items() if column not in leading_set]
+            
+            query = f"""
+                SELECT {', '.join(projection)}
+                FROM search_results sr
+                LEFT JOIN scraped_contacts sc ON sr.id = sc.search_result_id
+            """
+            if user_id:
+                query += " WHERE sr.user_id = ? OR sr.user_id IS NULL ORDER BY sr.created_at DESC"
+                return pd.read_sql_query(query, conn, params=[user_id])
+            query += " ORDER BY sr.created_at DESC"
+            return pd.read_sql_query(query, conn)
+    
     def insert_scraped_contact(self, search_result_id: int, contact_data: Dict):
         """Insert scraped contact data"""
         with sqlite3.connect(self.db_path) as conn:
@@ -376,6 +458,41 @@ class DatabaseManager:
             
             conn.commit()
     
+    def insert_scraped_contacts_bulk(self, rows: List[Tuple[int, Dict]]):
+        """Insert many (search_result_id, contact_data) pairs in a single transaction"""
+        if not rows:
+            return
+        
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            # Under WAL this skips the fsync per commit; a crash can lose only the last batch
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            
+            cursor.executemany("""
+                INSERT INTO scraped_contacts 
+                (search_result_id, scraped_names, scraped_phones, scraped_emails, 
+                 scraping_status, raw_response)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    search_result_id,
+                    contact_data.get('scraped_names'),
+                    contact_data.get('scraped_phones'),
+                    contact_data.get('scraped_emails'),
+                    contact_data.get('scraping_status'),
+                    contact_data.get('raw_response')
+                )
+                for search_result_id, contact_data in rows
+            ])
+            
+            # Mark search results as scraped
+            cursor.executemany("""
+                UPDATE search_results SET scraped = TRUE WHERE id = ?
+            """, [(search_result_id,) for search_result_id, _ in rows])
+            
+            conn.commit()
+    
     def get_statistics(self, user_id: int = None) -> Dict:
         """Get database statistics"""
         with sqlite3.connect(self.db_path) as conn:
@@ -0,0 +1,40 @@
+import numbers
+from datetime import date, datetime, time
+from typing import Any, BinaryIO, Union
+
+# Cell types openpyxl writes natively; anything else is written as its str()
+NATIVE_CELL_TYPES = (str, bool, numbers.Real, datetime, date, time)
+
+
+def _cell_value(value: Any) -> Any:
+    """Map one DataFrame value to something openpyxl can write"""
+    import pandas as pd
+    
+    try:
+        # None/NaN/NaT/pd.NA become blank cells like to_excel writes them
+        if pd.isna(value) is True:
+            return None
+    except (TypeError, ValueError):
+        pass
+    
+    if isinstance(value, NATIVE_CELL_TYPES):
+        return value
+    return str(value)
+
+
+def dataframe_to_xlsx(df, target: Union[str, BinaryIO], sheet_name: str = 'Sheet1'):
+    """
+    Write a DataFrame to an .xlsx file path or binary buffer
+    
+    Rows are streamed into a write-only openpyxl workbook instead of going
+    through DataFrame.to_excel, so the sheet is never held in memory whole.
+    """
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(col) for col in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        sheet.append([_cell_value(value) for value in row])
+    
+    workbook.save(target)
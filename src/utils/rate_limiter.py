@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+# HostRateLimiter drops stale hosts once it tracks more than this many
+MAX_TRACKED_HOSTS = 1024
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at least min_interval seconds apart"""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = max(min_interval, 0.0)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Block until the caller's slot comes up; returns immediately when unthrottled"""
+        if not self.min_interval:
+            return
+        
+        # Reserve the next slot under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HostRateLimiter:
+    """Thread-safe limiter that spaces calls to the same host at least min_interval seconds apart"""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = max(min_interval, 0.0)
+        self._lock = threading.Lock()
+        self._next_slots: Dict[str, float] = {}
+    
+    def reserve(self, url: str) -> float:
+        """Reserve the next slot for url's host and return the seconds until it comes up"""
+        if not self.min_interval:
+            return 0.0
+        
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            if len(self._next_slots) > MAX_TRACKED_HOSTS:
+                self._next_slots = {h: t for h, t in self._next_slots.items() if t > now}
+            
+            slot = max(now, self._next_slots.get(host, 0.0))
+            self._next_slots[host] = slot + self.min_interval
+        
+        return slot - now
+    
+    def wait(self, url: str):
+        """Block until the slot for url's host comes up; other hosts are not delayed"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Vegas-style asyncio concurrency limit
+    
+    The in-flight cap grows while call latency stays close to the fastest
+    latency seen, shrinks by one when latency shows requests queueing, and
+    halves when a call fails. Use from a single event loop.
+    """
+    
+    def __init__(self, initial_limit: int, min_limit: int = 1, max_limit: int = 32,
+                 alpha: float = 3.0, beta: float = 6.0):
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.alpha = alpha
+        self.beta = beta
+        self.in_flight = 0
+        self.min_rtt = None
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self):
+        """Wait until a slot is free under the current limit"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+    
+    async def release(self):
+        """Free a slot and wake waiters, which may now fit under a raised limit"""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+    
+    def on_success(self, rtt: float):
+        """Adjust the limit from one successful call's latency in seconds"""
+        if rtt <= 0:
+            return
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        
+        # Estimated number of requests waiting somewhere instead of being served
+        queued = self.limit * (1 - self.min_rtt / rtt)
+        if queued < self.alpha:
+            self.limit = min(self.limit + 1, self.max_limit)
+        elif queued > self.beta:
+            self.limit = max(self.limit - 1, self.min_limit)
+    
+    def on_drop(self):
+        """Halve the limit after a failed, rate-limited or timed-out call"""
+        self.limit = max(self.limit // 2, self.min_limit)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one upstream service
+    
+    After failure_threshold consecutive failures the circuit opens and
+    check() fails fast. Once reset_timeout seconds pass, one trial call is
+    let through per reset_timeout window; a success closes the circuit.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+    
+    def check(self):
+        """Raise CircuitOpenError while the circuit is open and no trial call is due"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            wait = self._opened_at + self.reset_timeout - now
+            if wait > 0:
+                raise CircuitOpenError(f"{self.name} unavailable after {self._failures} failures, "
+                                       f"retrying in {wait:.0f}s")
+            # Let this call through as the trial; others keep failing fast until it reports back
+            self._opened_at = now
+    
+    def record_success(self):
+        """Close the circuit"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+    
+    def record_failure(self):
+        """Count a failed call, opening the circuit at failure_threshold"""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
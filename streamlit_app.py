@@ -13,6 +13,7 @@ import platform
 # Import custom modules
 from src.utils.database import db_manager
 from src.utils.auth import auth_manager
+from src.utils.excel_export import dataframe_to_xlsx
 from src.services.serper_api import serper_api
 # Import the JSearch Job Scraper instead of Universal Job Scraper
 from jsearch_job_scraper import JSearchJobScraper, JOB_TEMPLATES
@@ -859,8 +860,7 @@ if 'scraping_results' not in st.session_state:
 def create_download_link(df, filename):
     """Create a download link for the DataFrame"""
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Scraped_Data')
+    dataframe_to_xlsx(df, output, sheet_name='Scraped_Data')
     
     excel_data = output.getvalue()
     return excel_data
@@ -1264,6 +1264,9 @@ def main():
         
         with col2:
             if st.button("🚀 Launch Search", type="primary", use_container_width=True, key="search_launch_btn"):
+                # Whitespace-only input never reaches the Serper API
+                search_query = search_query.strip()
+                location = location.strip()
                 if search_query and location:
                     with st.spinner("🔍 Conducting intelligent search..."):
                         try:
@@ -1597,6 +1600,8 @@ def main():
                 for key, value in template.items():
                     if key == "platform" and value:
                         st.text(f"🎯 Platform: {value.title()}")
+                    elif key == "queries":
+                        st.text(f"{key}: {list(value)}")
                     elif key != "platform":
                         st.text(f"{key}: {value}")
         
@@ -1825,7 +1830,7 @@ def main():
                             if selected_template != "Custom Search":
                                 template_config = JOB_TEMPLATES[selected_template]
                                 search_params = {
-                                    "query": template_config.get("queries", [job_query])[0] if isinstance(template_config.get("queries"), list) else job_query,
+                                    "query": template_config.get("queries", [job_query])[0] if isinstance(template_config.get("queries"), (list, tuple)) else job_query,
                                     "location": template_config.get("location", job_location),
                                     "employment_types": template_config.get("employment_types", ",".join(employment_types)),
                                     "remote_jobs_only": template_config.get("remote_jobs_only", remote_only),